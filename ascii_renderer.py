@@ -1,40 +1,85 @@
+from functools import lru_cache
 from typing import Mapping
 
-from levels import DIR_TO_CHAR, SINK
+from levels import SINK
 from simulation_constants import WATER_DIR_CHAR
 from simulation_state import WaterCell
 from typedefs import Coord
 
+_EMPTY = ord(".")
+_WALL = ord("#")
+_SINK = ord(SINK)
+# Water glyph per direction, indexed by (dx + 1) * 3 + (dy + 1).
+_WATER_LUT = bytes(
+    ord(WATER_DIR_CHAR.get((dx, dy), "~")) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+)
+# Byte shown after drawing water with direction index d over a cell currently
+# showing byte b, at [b * 9 + d]: walls and sinks take precedence over water.
+_WATER_OVERLAY = bytes(
+    b if b in (_WALL, _SINK) else _WATER_LUT[d] for b in range(256) for d in range(9)
+)
+
+
+@lru_cache(maxsize=None)
+def _coord_header(w: int, label_w: int) -> bytes:
+    return (" " * (label_w + 1) + "".join(str(x % 10) for x in range(w)) + "\n").encode("ascii")
+
 
 class AsciiRenderer:
     @staticmethod
-    def render(
+    def render_static(w: int, h: int, walls, emitters, sinks) -> bytearray:
+        """Render walls, sinks and emitters into a reusable row-major byte grid."""
+        # One flat byte per cell, row-major, with each row already terminated by
+        # a newline (stride w + 1): every write is a single index store and the
+        # finished board is one decode rather than a join over per-row strings.
+        stride = w + 1
+        grid = bytearray(b"." * w + b"\n") * h
+        for (x, y) in walls:
+            grid[y * stride + x] = _WALL
+        for (x, y) in sinks:
+            grid[y * stride + x] = _SINK
+        for e in emitters:
+            grid[e.y * stride + e.x] = e.char_byte
+        return grid
+
+    @staticmethod
+    def render_from_template(
+        template: bytearray,
         w: int,
         h: int,
-        walls,
-        emitters,
-        sinks,
         water: Mapping[Coord, WaterCell],
         show_coords: bool = False,
     ) -> str:
-        grid = [["." for _ in range(w)] for _ in range(h)]
-        for (x, y) in walls:
-            grid[y][x] = "#"
-        for (x, y) in sinks:
-            grid[y][x] = SINK
-        for e in emitters:
-            grid[e.y][e.x] = DIR_TO_CHAR.get((e.dx, e.dy), "E")
+        """Overlay water onto a copy of a render_static template."""
+        stride = w + 1
+        grid = bytearray(template)
         for (x, y), cell in water.items():
-            dx, dy = cell.dx, cell.dy
-            if grid[y][x] in f"#{SINK}":
-                continue
-            grid[y][x] = WATER_DIR_CHAR.get((dx, dy), "~")
+            offset = y * stride + x
+            grid[offset] = _WATER_OVERLAY[grid[offset] * 9 + cell.dir_idx]
         if not show_coords:
-            return "\n".join("".join(row) for row in grid)
+            return grid[:-1].decode("ascii")
 
+        # One buffer of (label, space, row, newline) lines filled in place;
+        # the board rows are copied straight out of the grid, newline included.
         label_w = max(2, len(str(h - 1)))
-        header = " " * (label_w + 1) + "".join(str(x % 10) for x in range(w))
-        lines = [header]
-        for y, row in enumerate(grid):
-            lines.append(f"{y:>{label_w}} " + "".join(row))
-        return "\n".join(lines)
+        line_w = label_w + 1 + stride
+        buf = bytearray(line_w * (h + 1))
+        buf[0:line_w] = _coord_header(w, label_w)
+        for y in range(h):
+            offset = line_w * (y + 1)
+            buf[offset:offset + label_w + 1] = b"%*d " % (label_w, y)
+            buf[offset + label_w + 1:offset + line_w] = grid[y * stride:(y + 1) * stride]
+        return buf[:-1].decode("ascii")
+
+    @staticmethod
+    def render(
+        w: int,
+        h: int,
+        walls,
+        emitters,
+        sinks,
+        water: Mapping[Coord, WaterCell],
+        show_coords: bool = False,
+    ) -> str:
+        template = AsciiRenderer.render_static(w, h, walls, emitters, sinks)
+        return AsciiRenderer.render_from_template(template, w, h, water, show_coords)
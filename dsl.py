@@ -1,108 +1,148 @@
-import math
-from typing import Callable, Dict, Iterable, List
+from typing import Callable, Dict, Iterable, List, Tuple
 
 from ascii_renderer import AsciiRenderer
 from levels import get_level, parse_level
 from movement_resolver import in_bounds
-from simulation_constants import STEP_MS
-from simulation_engine import SimulationEngine
+from simulation_engine import SimulationEngine, steps_for_ms
 from simulation_state import SimulationState
 from typedefs import Coord
 
+# A compiled script instruction: canonical op name plus its already-parsed arguments.
+Op = Tuple[str, tuple]
+
+
+def parse_coord(token: str) -> Coord:
+    if "," in token:
+        xs, ys = token.split(",", 1)
+    elif "x" in token:
+        xs, ys = token.split("x", 1)
+    else:
+        raise ValueError(f"Expected coordinate like '3,4', got '{token}'")
+    return int(xs), int(ys)
+
+
+def _compile_level(args: List[str]) -> Op:
+    if not args:
+        raise ValueError("level <name> expected")
+    return "level", (args[0],)
+
+
+def _compile_wait(args: List[str]) -> Op:
+    steps = int(args[0]) if args else 1
+    return "wait", (steps,)
+
+
+def _compile_wait_ms(args: List[str]) -> Op:
+    if not args:
+        raise ValueError("wait_ms <millis> expected")
+    ms = int(args[0])
+    return "wait", (steps_for_ms(ms),)
+
+
+def _compile_add(args: List[str]) -> Op:
+    if not args:
+        raise ValueError("add <x,y>")
+    return "add", parse_coord(args[0])
+
+
+def _compile_remove(args: List[str]) -> Op:
+    if not args:
+        raise ValueError("remove <x,y>")
+    return "remove", parse_coord(args[0])
+
+
+def build_compilers() -> Dict[str, Callable[[List[str]], Op]]:
+    compilers: Dict[str, Callable[[List[str]], Op]] = {}
+
+    def register(names: Iterable[str], func: Callable[[List[str]], Op]) -> None:
+        for name in names:
+            compilers[name] = func
+
+    register(("level",), _compile_level)
+    register(("wait", "step", "steps", "tick"), _compile_wait)
+    register(("wait_ms", "sleep"), _compile_wait_ms)
+    register(("add", "wall+", "wall"), _compile_add)
+    register(("remove", "rm", "del", "wall-"), _compile_remove)
+    return compilers
+
+
+_COMPILERS = build_compilers()
+
+
+def compile_script(script_text: str) -> List[Op]:
+    """Parse a script once into ops so execution does no string handling."""
+    program: List[Op] = []
+    for raw in script_text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        commands = [cmd.strip() for cmd in line.split(";") if cmd.strip()]
+        for cmd in commands:
+            parts = cmd.split()
+            name = parts[0].lower()
+            args = parts[1:]
+
+            compiler = _COMPILERS.get(name)
+            if compiler is None:
+                raise ValueError(f"Unknown script command '{name}'")
+            program.append(compiler(args))
+    return program
+
 
 def run_script(script_text: str, default_level_name: str = "turn") -> None:
+    program = compile_script(script_text)
+
+    def load_level(name: str) -> tuple:
+        # parse_level is memoised on the level text and returns fresh sets, so
+        # revisiting a level is cheap and `add`/`remove` edits never leak into
+        # the next visit.
+        return parse_level(get_level(name))
+
     state = SimulationState()
     state.clear_sink_claims()
-    level_lines = get_level(default_level_name)
-    w, h, walls, emitters, sinks = parse_level(level_lines)
-    emitter_positions = {(e.x, e.y) for e in emitters}
-    water = state.water
+    w, h, walls, emitters, sinks = load_level(default_level_name)
+    # Cells a wall may never be placed on: emitters and sinks never move within
+    # a level, so this is rebuilt only on `level` and each `add` is one lookup.
+    fixed_cells = {(e.x, e.y) for e in emitters} | sinks
     engine = SimulationEngine()
 
     def advance_steps(steps: int) -> None:
         for _ in range(max(0, steps)):
             engine.tick(w, h, walls, emitters, sinks, state)
 
-    def parse_coord(token: str) -> Coord:
-        if "," in token:
-            xs, ys = token.split(",", 1)
-        elif "x" in token:
-            xs, ys = token.split("x", 1)
-        else:
-            raise ValueError(f"Expected coordinate like '3,4', got '{token}'")
-        return int(xs), int(ys)
-
-    def handle_level(args: List[str]) -> None:
-        nonlocal w, h, walls, emitters, sinks, level_lines
-        if not args:
-            raise ValueError("level <name> expected")
-        level_lines = get_level(args[0])
-        w, h, walls, emitters, sinks = parse_level(level_lines)
-        emitter_positions.clear()
-        emitter_positions.update((e.x, e.y) for e in emitters)
+    def handle_level(name: str) -> None:
+        nonlocal w, h, walls, emitters, sinks
+        w, h, walls, emitters, sinks = load_level(name)
+        fixed_cells.clear()
+        fixed_cells.update((e.x, e.y) for e in emitters)
+        fixed_cells.update(sinks)
         state.clear_water()
 
-    def handle_wait(args: List[str]) -> None:
-        steps = int(args[0]) if args else 1
-        advance_steps(steps)
-
-    def handle_wait_ms(args: List[str]) -> None:
-        if not args:
-            raise ValueError("wait_ms <millis> expected")
-        ms = int(args[0])
-        steps = max(1, int(math.ceil(ms / float(STEP_MS))))
-        advance_steps(steps)
-
-    def handle_add(args: List[str]) -> None:
-        if not args:
-            raise ValueError("add <x,y>")
-        x, y = parse_coord(args[0])
+    # Edits off the board are skipped: an out-of-bounds wall would index past
+    # the level's flag grid.
+    def handle_add(x: int, y: int) -> None:
         if not in_bounds(x, y, w, h):
             return
-        if (x, y) in emitter_positions or (x, y) in sinks:
+        if (x, y) in fixed_cells:
             return
         walls.add((x, y))
-        water.pop((x, y), None)
+        state.water.pop((x, y), None)
 
-    def handle_remove(args: List[str]) -> None:
-        if not args:
-            raise ValueError("remove <x,y>")
-        x, y = parse_coord(args[0])
+    def handle_remove(x: int, y: int) -> None:
         if not in_bounds(x, y, w, h):
             return
         walls.discard((x, y))
-        water.pop((x, y), None)
-
-    def build_handlers() -> Dict[str, Callable[[List[str]], None]]:
-        handlers: Dict[str, Callable[[List[str]], None]] = {}
-
-        def register(names: Iterable[str], func: Callable[[List[str]], None]) -> None:
-            for name in names:
-                handlers[name] = func
+        state.water.pop((x, y), None)
 
-        register(("level",), handle_level)
-        register(("wait", "step", "steps", "tick"), handle_wait)
-        register(("wait_ms", "sleep"), handle_wait_ms)
-        register(("add", "wall+", "wall"), handle_add)
-        register(("remove", "rm", "del", "wall-"), handle_remove)
-        return handlers
+    handlers: Dict[str, Callable[..., None]] = {
+        "level": handle_level,
+        "wait": advance_steps,
+        "add": handle_add,
+        "remove": handle_remove,
+    }
 
-    handlers = build_handlers()
-
-    for raw in script_text.splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#"):
-            continue
-        commands = [cmd.strip() for cmd in line.split(";") if cmd.strip()]
-        for cmd in commands:
-            parts = cmd.split()
-            name = parts[0].lower()
-            args = parts[1:]
-
-            handler = handlers.get(name)
-            if handler is None:
-                raise ValueError(f"Unknown script command '{name}'")
-            handler(args)
+    for op, args in program:
+        handlers[op](*args)
 
     print("Script complete")
-    print(AsciiRenderer.render(w, h, walls, emitters, sinks, water, show_coords=True))
+    print(AsciiRenderer.render(w, h, walls, emitters, sinks, state.water, show_coords=True))
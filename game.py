@@ -9,10 +9,13 @@ from graphics import (
     WallSprite,
     build_static_sprites,
     emitter_color_for_id,
+    get_hint_surface,
+    release_water,
     sync_connector_sprites,
     sync_sink_sprites,
     sync_water_sprites,
 )
+from level_grid import EMITTER, SINK, WALL, LevelGrid
 from levels import (
     DIRS, DIR_TO_CHAR, Emitter, LEVEL_ORDER, LEVELS,
     get_custom_level_names, get_level, parse_level, save_level_json,
@@ -23,10 +26,25 @@ from simulation_state import SimulationState
 from solver import get_hint
 
 FPS = 60
+BACKGROUND_COLOR = (20, 20, 20)
 GAME_SPEED = 5.0  # multiplier on simulation speed in the interactive view
+MAX_CATCHUP_STEPS = 4  # most simulation steps run in a single frame
+IDLE_WAIT_MS = 250  # longest block on the event queue while nothing is animating
 _ENGINE = SimulationEngine()
 PULSE_DURATION_MS = 500  # ms for one pulse ring to expand and fade
 PULSE_MAX_RADIUS = int(TILE * 1.6)  # max ring radius in pixels
+_NUMBER_KEYS = (
+    pygame.K_1,
+    pygame.K_2,
+    pygame.K_3,
+    pygame.K_4,
+    pygame.K_5,
+    pygame.K_6,
+    pygame.K_7,
+    pygame.K_8,
+    pygame.K_9,
+    pygame.K_0,
+)
 
 
 class GameState(Enum):
@@ -74,49 +92,67 @@ class LevelState:
         self.emitter_colors = {}
         self.sinks = set()
         self.next_emitter_id = 0
+        self._ascii_template = None
+        self._level_grid = None
         self.load(initial_level)
 
     def load(self, name: str) -> None:
         self.current_level = name
         level_lines = get_level(name)
         self.w, self.h, self.walls, self.emitters, self.sinks = parse_level(level_lines)
-        self.emitter_positions = {(e.x, e.y) for e in self.emitters}
-        self.emitter_map = {(e.x, e.y): e for e in self.emitters}
-        self.emitter_colors = {e.id: emitter_color_for_id(e.id) for e in self.emitters}
-        self.next_emitter_id = (max((e.id for e in self.emitters), default=-1) + 1)
-
-    def _blocked(self, gx, gy) -> bool:
-        return (gx, gy) in self.sinks or (gx, gy) in self.emitter_positions
+        self.emitter_positions = set()
+        self.emitter_map = {}
+        self.emitter_colors = {}
+        next_id = 0
+        for e in self.emitters:
+            pos = (e.x, e.y)
+            self.emitter_positions.add(pos)
+            self.emitter_map[pos] = e
+            self.emitter_colors[e.id] = emitter_color_for_id(e.id)
+            next_id = max(next_id, e.id + 1)
+        self.next_emitter_id = next_id
+        self._changed()
+
+    def _changed(self) -> None:
+        """Drop layers derived from the static level after an edit."""
+        self._ascii_template = None
+        self._level_grid = None
+
+    def level_grid(self) -> LevelGrid:
+        """Simulation flag grid for the current layout; rebuilt only after an edit."""
+        if self._level_grid is None:
+            self._level_grid = LevelGrid(self.w, self.h, self.walls, self.emitters, self.sinks)
+        return self._level_grid
+
+    def ascii_template(self) -> bytearray:
+        """Static ASCII layer (walls, sinks, emitters); rebuilt only after an edit."""
+        if self._ascii_template is None:
+            self._ascii_template = AsciiRenderer.render_static(
+                self.w, self.h, self.walls, self.emitters, self.sinks
+            )
+        return self._ascii_template
+
+    def _flags(self, gx, gy) -> int:
+        # Occupancy comes from the simulation grid's flag bytes, the single
+        # copy of the wall/sink/emitter bits; an edit drops the grid and the
+        # next lookup or tick rebuilds it from the sets.
+        return self.level_grid().flags[gy * self.w + gx]
 
-    def toggle_wall(self, gx, gy):
-        if self._blocked(gx, gy):
-            return None
-        if (gx, gy) in self.walls:
-            self.walls.remove((gx, gy))
-            return "removed"
+    def add_wall(self, gx, gy):
         self.walls.add((gx, gy))
-        return "added"
+        self._changed()
 
-    def place_wall(self, gx, gy):
-        if self._blocked(gx, gy) or (gx, gy) in self.walls:
-            return None
-        self.walls.add((gx, gy))
-        return "added"
+    def remove_wall(self, gx, gy):
+        self.walls.discard((gx, gy))
+        self._changed()
 
-    def toggle_sink(self, gx, gy):
-        if (gx, gy) in self.emitter_positions or (gx, gy) in self.walls:
-            return None
-        if (gx, gy) in self.sinks:
-            self.sinks.remove((gx, gy))
-            return "removed"
+    def add_sink(self, gx, gy):
         self.sinks.add((gx, gy))
-        return "added"
+        self._changed()
 
-    def place_sink(self, gx, gy):
-        if (gx, gy) in self.sinks or (gx, gy) in self.emitter_positions or (gx, gy) in self.walls:
-            return None
-        self.sinks.add((gx, gy))
-        return "added"
+    def remove_sink(self, gx, gy):
+        self.sinks.discard((gx, gy))
+        self._changed()
 
     def _add_emitter(self, gx, gy, direction):
         dx, dy = direction
@@ -126,31 +162,53 @@ class LevelState:
         self.emitter_positions.add((gx, gy))
         self.emitter_map[(gx, gy)] = emitter
         self.emitter_colors[emitter.id] = emitter_color_for_id(emitter.id)
+        self._changed()
         return emitter
 
     def _remove_emitter(self, gx, gy):
         emitter = self.emitter_map.pop((gx, gy), None)
         if emitter is None:
             return None
+        # Emitter order decides which of two emitters sharing a target spawns
+        # into it, so removal must keep the others in their original order.
         self.emitters[:] = [e for e in self.emitters if e.id != emitter.id]
         self.emitter_positions.discard((gx, gy))
         self.emitter_colors.pop(emitter.id, None)
+        self._changed()
         return emitter
 
-    def toggle_emitter(self, gx, gy, direction):
-        if (gx, gy) in self.walls or (gx, gy) in self.sinks:
+    def _add(self, gx, gy, kind, direction):
+        if kind == WALL:
+            self.add_wall(gx, gy)
+        elif kind == SINK:
+            self.add_sink(gx, gy)
+        else:
+            return self._add_emitter(gx, gy, direction)
+        return None
+
+    def _remove(self, gx, gy, kind):
+        if kind == WALL:
+            self.remove_wall(gx, gy)
+        elif kind == SINK:
+            self.remove_sink(gx, gy)
+        else:
+            return self._remove_emitter(gx, gy)
+        return None
+
+    def toggle(self, gx, gy, kind, direction=None):
+        """Add or remove a WALL/SINK/EMITTER at a cell; returns (action, emitter)."""
+        flags = self._flags(gx, gy)
+        if flags & ~kind:
             return None, None
-        if (gx, gy) in self.emitter_positions:
-            emitter = self._remove_emitter(gx, gy)
-            return "removed", emitter
-        emitter = self._add_emitter(gx, gy, direction)
-        return "added", emitter
-
-    def place_emitter(self, gx, gy, direction):
-        if (gx, gy) in self.walls or (gx, gy) in self.sinks or (gx, gy) in self.emitter_positions:
+        if flags & kind:
+            return "removed", self._remove(gx, gy, kind)
+        return "added", self._add(gx, gy, kind, direction)
+
+    def place(self, gx, gy, kind, direction=None):
+        """Add a WALL/SINK/EMITTER only if the cell is empty; returns (action, emitter)."""
+        if self._flags(gx, gy):
             return None, None
-        emitter = self._add_emitter(gx, gy, direction)
-        return "added", emitter
+        return "added", self._add(gx, gy, kind, direction)
 
 
 class PlaceWallCommand:
@@ -159,12 +217,12 @@ class PlaceWallCommand:
         self.gy = gy
 
     def undo(self, level_state, view, clear_water):
-        level_state.walls.discard((self.gx, self.gy))
+        level_state.remove_wall(self.gx, self.gy)
         view.remove_wall(self.gx, self.gy)
         clear_water()
 
     def redo(self, level_state, view, clear_water):
-        level_state.walls.add((self.gx, self.gy))
+        level_state.add_wall(self.gx, self.gy)
         view.add_wall(self.gx, self.gy)
         clear_water()
 
@@ -175,12 +233,12 @@ class RemoveWallCommand:
         self.gy = gy
 
     def undo(self, level_state, view, clear_water):
-        level_state.walls.add((self.gx, self.gy))
+        level_state.add_wall(self.gx, self.gy)
         view.add_wall(self.gx, self.gy)
         clear_water()
 
     def redo(self, level_state, view, clear_water):
-        level_state.walls.discard((self.gx, self.gy))
+        level_state.remove_wall(self.gx, self.gy)
         view.remove_wall(self.gx, self.gy)
         clear_water()
 
@@ -216,113 +274,174 @@ class CommandHistory:
 class ViewContext:
     def __init__(self, header_height: int):
         self.header_height = header_height
-        self.static_sprites = pygame.sprite.Group()
         self.wall_lookup = {}
         self.sink_lookup = {}
         self.emitter_lookup = {}
+        # Background plus every wall, sink and emitter, composited once and
+        # patched tile by tile on edits so each frame is a single blit.
+        self._static_layer = None
+        self._overlay = None  # reusable full-grid SRCALPHA scratch surface
+        self._shown_claims = {}  # sink pos -> owner id the static layer currently shows
+        # Row/column labels, drawn above everything else on the grid.
+        self._coords_layer = None
         self.screen = None
+        self.grid_surface = None
 
     def create_screen(self, w, h):
         self.screen = pygame.display.set_mode((w * TILE, h * TILE + self.header_height))
+        # Board area below the header; only invalidated when the screen is recreated.
+        self.grid_surface = self.screen.subsurface((0, self.header_height, w * TILE, h * TILE))
 
     def rebuild_static(self, level: LevelState):
-        self.static_sprites, self.wall_lookup, self.sink_lookup, self.emitter_lookup = build_static_sprites(
+        self.wall_lookup, self.sink_lookup, self.emitter_lookup = build_static_sprites(
             level.walls, level.sinks, level.emitters, level.emitter_colors
         )
+        self._static_layer = pygame.Surface((level.w * TILE, level.h * TILE)).convert()
+        self._static_layer.fill(BACKGROUND_COLOR)
+        blits = [(sprite.image, sprite.rect) for sprite in self.wall_lookup.values()]
+        blits.extend([(sprite.image, sprite.rect) for sprite in self.sink_lookup.values()])
+        blits.extend([(sprite.image, sprite.rect) for _emitter, sprite in self.emitter_lookup.values()])
+        self._static_layer.blits(blits, doreturn=False)
+        self._shown_claims = {}
+        if self._overlay is None or self._overlay.get_size() != self._static_layer.get_size():
+            self._overlay = pygame.Surface(self._static_layer.get_size(), pygame.SRCALPHA)
+
+    def draw_static(self, surface):
+        surface.blit(self._static_layer, (0, 0))
+
+    def clear_overlay(self):
+        """Return the shared translucent overlay surface, cleared for this frame."""
+        self._overlay.fill((0, 0, 0, 0))
+        return self._overlay
+
+    def rebuild_coords(self, w, h, font):
+        self._coords_layer = pygame.Surface((w * TILE, h * TILE), pygame.SRCALPHA)
+        labels = {}
+        blits = []
+        placements = [(str(x % 10), (x * TILE + 4, 2)) for x in range(w)]
+        placements.extend([(str(y), (2, y * TILE + 2)) for y in range(h)])
+        for text, pos in placements:
+            label = labels.get(text)
+            if label is None:
+                label = labels[text] = font.render(text, True, (140, 140, 140))
+            blits.append((label, pos))
+        self._coords_layer.blits(blits, doreturn=False)
+
+    def draw_coords(self, surface):
+        surface.blit(self._coords_layer, (0, 0))
+
+    def _paint(self, sprite):
+        self._static_layer.fill(BACKGROUND_COLOR, sprite.rect)
+        self._static_layer.blit(sprite.image, sprite.rect)
+
+    def _erase(self, sprite):
+        self._static_layer.fill(BACKGROUND_COLOR, sprite.rect)
 
     def add_wall(self, gx, gy):
         sprite = WallSprite(gx, gy)
         self.wall_lookup[(gx, gy)] = sprite
-        self.static_sprites.add(sprite)
+        self._paint(sprite)
 
     def remove_wall(self, gx, gy):
         sprite = self.wall_lookup.pop((gx, gy), None)
         if sprite:
-            sprite.kill()
+            self._erase(sprite)
 
     def add_sink(self, gx, gy):
         sprite = SinkSprite(gx, gy)
         self.sink_lookup[(gx, gy)] = sprite
-        self.static_sprites.add(sprite)
+        self._shown_claims.pop((gx, gy), None)
+        self._paint(sprite)
 
     def remove_sink(self, gx, gy):
         sprite = self.sink_lookup.pop((gx, gy), None)
         if sprite:
-            sprite.kill()
+            self._shown_claims.pop((gx, gy), None)
+            self._erase(sprite)
 
     def add_emitter(self, emitter):
         color = emitter_color_for_id(emitter.id)
         sprite = EmitterSprite(emitter, color)
         self.emitter_lookup[(emitter.x, emitter.y)] = (emitter, sprite)
-        self.static_sprites.add(sprite)
+        self._paint(sprite)
 
     def remove_emitter(self, gx, gy):
-        existing = self.emitter_lookup.pop((gx, gy), None)
-        if existing:
-            _emitter, sprite = existing
-            sprite.kill()
+        entry = self.emitter_lookup.pop((gx, gy), None)
+        if entry:
+            self._erase(entry[1])
 
     def sync_sinks(self, sink_claims, emitter_colors):
-        sync_sink_sprites(self.sink_lookup, sink_claims, emitter_colors)
+        # Only touch sinks whose owner changed since the last sync.
+        shown = self._shown_claims
+        changed = [pos for pos, owner in sink_claims.items() if shown.get(pos) != owner]
+        changed.extend(shown.keys() - sink_claims.keys())
+        if not changed:
+            return
+        sync_sink_sprites(self.sink_lookup, sink_claims, emitter_colors, changed)
+        for pos in changed:
+            sprite = self.sink_lookup.get(pos)
+            if sprite is not None:
+                self._paint(sprite)
+        self._shown_claims = dict(sink_claims)
 
 
 class WaterState:
     def __init__(self):
         self.sim_state = SimulationState()
-        self.water_sprites = pygame.sprite.Group()
-        self.connector_sprites = pygame.sprite.Group()
+        self.water_sprites = {}  # (x, y) -> WaterSprite
+        self.connector_sprites = {}  # (x, y, dx, dy) -> ConnectorSprite
+        # (image, rect) for every connector then every water tile, rebuilt on sync.
+        self._blits = []
+        self._dirty = True  # water changed since the sprites were last synced
 
     def clear(self):
         self.sim_state.clear_water()
         self.sim_state.clear_sink_claims()
-        self.water_sprites.empty()
-        self.connector_sprites.empty()
+        for sprite in self.water_sprites.values():
+            release_water(sprite)
+        self.water_sprites.clear()
+        self.connector_sprites.clear()
+        self._blits = []
+        self._dirty = True
 
     def clear_at(self, gx, gy):
-        self.sim_state.water.pop((gx, gy), None)
+        if self.sim_state.water.pop((gx, gy), None) is not None:
+            self._dirty = True
 
     def step(self, level: LevelState):
-        return _ENGINE.tick(level.w, level.h, level.walls, level.emitters, level.sinks, self.sim_state)
+        self._dirty = True
+        return _ENGINE.tick(
+            level.w, level.h, level.walls, level.emitters, level.sinks, self.sim_state, level.level_grid()
+        )
 
-    def sync(self, level: LevelState):
+    def sync(self, level: LevelState) -> bool:
+        """Bring the water sprites up to date; returns False if nothing changed."""
+        if not self._dirty:
+            return False
+        self._dirty = False
         sync_water_sprites(self.sim_state.water, self.water_sprites, level.emitter_colors, _ENGINE.decay_steps)
         sync_connector_sprites(self.sim_state.water, self.connector_sprites, level.emitter_colors)
+        blits = [(sprite.image, sprite.rect) for sprite in self.connector_sprites.values()]
+        blits.extend([(sprite.image, sprite.rect) for sprite in self.water_sprites.values()])
+        self._blits = blits
+        return True
 
+    def draw(self, surface):
+        surface.blits(self._blits, doreturn=False)
 
-def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
-    def draw_coords(surface, w, h, font):
-        color = (140, 140, 140)
-        for x in range(w):
-            label = font.render(str(x % 10), True, color)
-            surface.blit(label, (x * TILE + 4, 2))
-        for y in range(h):
-            label = font.render(str(y), True, color)
-            surface.blit(label, (2, y * TILE + 2))
 
+def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
     pygame.init()
-    level_order = [name for name in LEVEL_ORDER if name in LEVELS]
-    base_number_keys = [
-        pygame.K_1,
-        pygame.K_2,
-        pygame.K_3,
-        pygame.K_4,
-        pygame.K_5,
-        pygame.K_6,
-        pygame.K_7,
-        pygame.K_8,
-        pygame.K_9,
-        pygame.K_0,
-    ]
-    number_keys = base_number_keys[: len(level_order)]
-    level_hotkeys = {key: name for key, name in zip(number_keys, level_order)}
+    # zip stops at the shorter side, so this filters, truncates and maps in one pass.
+    level_hotkeys = dict(zip(_NUMBER_KEYS, (name for name in LEVEL_ORDER if name in LEVELS)))
 
-    if number_keys:
-        if len(number_keys) == 10:
+    if level_hotkeys:
+        if len(level_hotkeys) == 10:
             key_hint = "1-9,0"
-        elif len(number_keys) == 1:
+        elif len(level_hotkeys) == 1:
             key_hint = "1"
         else:
-            key_hint = f"1-{len(number_keys)}"
+            key_hint = f"1-{len(level_hotkeys)}"
         hotkey_text = f"{key_hint}: change level"
     else:
         hotkey_text = "No level hotkeys"
@@ -335,19 +454,30 @@ def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
         "EDITOR MODE | Tab: back to game | Ctrl+S: save level | Ctrl+O: load next custom level",
         "Modes: W wall | S sink | E emitter (tap again to rotate) | Left-click place/remove | Right-click clear water",
     ]
-    instructions = play_instructions
     header_font = pygame.font.SysFont(None, 16)
     header_pad = 4
-    header_line_count = len(instructions) + 2  # moves line + win status line
-    header_height = header_font.get_linesize() * header_line_count + header_pad * 2
+    header_text_color = (200, 200, 200)
+    # Instruction lines never change, so rasterize them once per mode.
+    play_instruction_surfs = [header_font.render(line, True, header_text_color) for line in play_instructions]
+    editor_instruction_surfs = [header_font.render(line, True, header_text_color) for line in editor_instructions]
+    instruction_surfs = play_instruction_surfs
+    status_surfs = {}  # status text -> rendered surface
+    moves_surf = None
+    moves_rendered = None  # move count moves_surf was rendered for
+    header_line_count = len(instruction_surfs) + 2  # moves line + win status line
+    header_linesize = header_font.get_linesize()
+    header_height = header_linesize * header_line_count + header_pad * 2
     font = pygame.font.SysFont(None, 14)
     clock = pygame.time.Clock()
 
+    ring_scratch = pygame.Surface((PULSE_MAX_RADIUS * 2 + 6,) * 2, pygame.SRCALPHA)
+
     input_mode = InputMode(DIRS.values())
     level_state = LevelState(initial_level)
     view = ViewContext(header_height)
     view.create_screen(level_state.w, level_state.h)
     view.rebuild_static(level_state)
+    view.rebuild_coords(level_state.w, level_state.h, font)
     water_state = WaterState()
     history = CommandHistory()
 
@@ -357,6 +487,7 @@ def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
     hint_cell = None  # (gx, gy) of the currently suggested wall, or None
     show_territory = False  # toggleable emitter territory overlay
     pulses = []  # list of {'ex': int, 'ey': int, 'color': tuple, 'age_ms': float}
+    pending_drag_cells = {}  # insertion-ordered set of (gx, gy) dragged over this frame
 
     step_acc = 0
     running = True
@@ -394,6 +525,7 @@ def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
         level_state.load(name)
         view.create_screen(level_state.w, level_state.h)
         view.rebuild_static(level_state)
+        view.rebuild_coords(level_state.w, level_state.h, font)
         clear_water_state()
         reset_moves()
         hint_cell = None
@@ -401,47 +533,63 @@ def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
         history.clear()
         update_caption()
 
+    # The handle_* functions edit the level and view and report whether anything
+    # changed; the caller owns the (comparatively expensive) water reset.
+    def edit_level(gx, gy, kind, toggle, direction=None):
+        if toggle:
+            return level_state.toggle(gx, gy, kind, direction)
+        return level_state.place(gx, gy, kind, direction)
+
     def handle_wall(gx, gy, toggle=True):
-        action = level_state.toggle_wall(gx, gy) if toggle else level_state.place_wall(gx, gy)
+        action, _ = edit_level(gx, gy, WALL, toggle)
         if action == "added":
             view.add_wall(gx, gy)
-            clear_water_state()
             history.push(PlaceWallCommand(gx, gy))
-        elif action == "removed":
+            return True
+        if action == "removed":
             view.remove_wall(gx, gy)
-            clear_water_state()
             history.push(RemoveWallCommand(gx, gy))
+            return True
+        return False
 
     def handle_sink(gx, gy, toggle=True):
-        action = level_state.toggle_sink(gx, gy) if toggle else level_state.place_sink(gx, gy)
+        action, _ = edit_level(gx, gy, SINK, toggle)
         if action == "added":
             view.add_sink(gx, gy)
-            clear_water_state()
-        elif action == "removed":
+            return True
+        if action == "removed":
             view.remove_sink(gx, gy)
-            clear_water_state()
+            return True
+        return False
 
     def handle_emitter(gx, gy, toggle=True):
-        direction = input_mode.current_dir()
-        action, emitter = (
-            level_state.toggle_emitter(gx, gy, direction)
-            if toggle
-            else level_state.place_emitter(gx, gy, direction)
-        )
+        action, emitter = edit_level(gx, gy, EMITTER, toggle, input_mode.current_dir())
         if action == "added" and emitter:
             view.add_emitter(emitter)
-            clear_water_state()
-        elif action == "removed":
+            return True
+        if action == "removed":
             view.remove_emitter(gx, gy)
-            clear_water_state()
+            return True
+        return False
+
+    mode_handlers = {"wall": handle_wall, "sink": handle_sink, "emitter": handle_emitter}
+
+    def edit_cell(gx, gy, toggle):
+        return mode_handlers[input_mode.placement_mode](gx, gy, toggle)
 
     def apply_action(gx, gy, toggle=True):
-        if input_mode.placement_mode == "wall":
-            handle_wall(gx, gy, toggle)
-        elif input_mode.placement_mode == "sink":
-            handle_sink(gx, gy, toggle)
-        elif input_mode.placement_mode == "emitter":
-            handle_emitter(gx, gy, toggle)
+        if edit_cell(gx, gy, toggle):
+            clear_water_state()
+
+    def flush_drag_edits():
+        # A fast drag yields many MOUSEMOTION events per frame; apply the cells in
+        # order but reset the water only once for the whole batch.
+        changed = False
+        for gx, gy in pending_drag_cells:
+            changed = edit_cell(gx, gy, False) or changed
+        pending_drag_cells.clear()
+        if changed:
+            clear_water_state()
 
     def clear_water_at(gx, gy):
         water_state.clear_at(gx, gy)
@@ -453,120 +601,173 @@ def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
                 color = level_state.emitter_colors.get(emitter.id, emitter_color_for_id(emitter.id))
                 pulses.append({'ex': emitter.x, 'ey': emitter.y, 'color': color, 'age_ms': 0.0})
 
-    def sync_water():
-        water_state.sync(level_state)
+    def sync_water() -> bool:
+        if not water_state.sync(level_state):
+            return False
         sync_sinks()
+        return True
 
     def all_sinks_saturated() -> bool:
         if not level_state.sinks:
             return False
         return all(sink in water_state.sim_state.sink_claims for sink in level_state.sinks)
 
+    def toggle_pause():
+        nonlocal state
+        if state == GameState.PLAYING:
+            state = GameState.PAUSED
+        elif state == GameState.PAUSED:
+            state = GameState.PLAYING
+
+    def single_step():
+        if state in (GameState.PLAYING, GameState.PAUSED):
+            step_simulation()
+
+    def undo():
+        history.undo(level_state, view, clear_water_state)
+
+    def redo():
+        history.redo(level_state, view, clear_water_state)
+
+    def reset_water_and_moves():
+        nonlocal state
+        clear_water_state()
+        reset_moves()
+        if state in (GameState.PAUSED, GameState.WON):
+            state = GameState.PLAYING
+
+    def toggle_territory():
+        nonlocal show_territory
+        show_territory = not show_territory
+
+    def show_hint():
+        nonlocal hint_cell
+        hint_cell = get_hint(
+            level_state.w,
+            level_state.h,
+            frozenset(level_state.walls),
+            level_state.emitters,
+            level_state.sinks,
+            frozenset(),
+        )
+
+    def select_mode(mode):
+        if input_mode.set_mode(mode):
+            update_caption()
+
+    def select_emitter_mode():
+        if input_mode.placement_mode == "emitter":
+            input_mode.rotate()
+        else:
+            select_mode("emitter")
+        update_caption()
+
+    def print_map(water):
+        print(
+            AsciiRenderer.render_from_template(
+                level_state.ascii_template(),
+                level_state.w,
+                level_state.h,
+                water,
+                show_coords=True,
+            )
+        )
+
+    def toggle_editor():
+        nonlocal state, instruction_surfs
+        if state == GameState.EDITOR:
+            state = GameState.PLAYING
+            instruction_surfs = play_instruction_surfs
+        else:
+            state = GameState.EDITOR
+            instruction_surfs = editor_instruction_surfs
+        update_caption()
+
+    def save_level():
+        nonlocal save_counter
+        save_counter += 1
+        name = f"{level_state.current_level}_edit{save_counter}"
+        path = save_level_json(
+            name,
+            level_state.w,
+            level_state.h,
+            level_state.walls,
+            level_state.emitters,
+            level_state.sinks,
+        )
+        print(f"Saved level '{name}' to {path}")
+
+    def open_next_custom_level():
+        nonlocal custom_level_index
+        custom_names = get_custom_level_names()
+        if custom_names:
+            name = custom_names[custom_level_index % len(custom_names)]
+            custom_level_index = (custom_level_index + 1) % len(custom_names)
+            load_level(name)
+
+    key_handlers = {
+        pygame.K_SPACE: toggle_pause,
+        pygame.K_n: single_step,
+        pygame.K_r: reset_water_and_moves,
+        pygame.K_t: toggle_territory,
+        pygame.K_h: show_hint,
+        pygame.K_w: lambda: select_mode("wall"),
+        pygame.K_s: lambda: select_mode("sink"),
+        pygame.K_e: select_emitter_mode,
+        pygame.K_m: lambda: print_map({}),
+        pygame.K_p: lambda: print_map(water_state.sim_state.water),
+        pygame.K_TAB: toggle_editor,
+    }
+    for key, name in level_hotkeys.items():
+        key_handlers[key] = lambda name=name: load_level(name)
+    # Checked before key_handlers while Ctrl is held; other keys fall through.
+    ctrl_key_handlers = {
+        pygame.K_z: undo,
+        pygame.K_y: redo,
+        pygame.K_s: save_level,
+        pygame.K_o: open_next_custom_level,
+    }
+
     update_caption()
 
+    # Redraw only when something visible may have changed: input, a simulation
+    # step, a water resync or a running pulse animation. Idle frames (paused,
+    # won, or editing without input) skip drawing and flipping entirely. Mouse
+    # motion alone changes nothing on screen; a drag that edits the level or
+    # clears water shows up through the water resync instead.
+    frame_dirty = True
     while running:
         dt = clock.tick(FPS)
-        step_acc += dt * GAME_SPEED
-
-        for event in pygame.event.get():
+        if state == GameState.PLAYING:
+            step_acc += dt * GAME_SPEED
+
+        if state != GameState.PLAYING and not pulses and not frame_dirty:
+            # Nothing can change until input arrives: sleep in SDL rather than
+            # waking every frame just to poll an empty queue.
+            first = pygame.event.wait(IDLE_WAIT_MS)
+            events = pygame.event.get()
+            if first.type != pygame.NOEVENT:
+                events.insert(0, first)
+        else:
+            events = pygame.event.get()
+        for event in events:
+            if event.type != pygame.MOUSEMOTION:
+                frame_dirty = True
+            if pending_drag_cells and event.type != pygame.MOUSEMOTION:
+                # Keep drag edits ordered relative to clicks, mode switches and undo.
+                flush_drag_edits()
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    if state == GameState.PLAYING:
-                        state = GameState.PAUSED
-                    elif state == GameState.PAUSED:
-                        state = GameState.PLAYING
-                elif event.key == pygame.K_n:
-                    if state in (GameState.PLAYING, GameState.PAUSED):
-                        step_simulation()
-                elif event.key == pygame.K_z and (event.mod & pygame.KMOD_CTRL):
-                    history.undo(level_state, view, clear_water_state)
-                elif event.key == pygame.K_y and (event.mod & pygame.KMOD_CTRL):
-                    history.redo(level_state, view, clear_water_state)
-                elif event.key == pygame.K_r:
-                    clear_water_state()
-                    reset_moves()
-                    if state in (GameState.PAUSED, GameState.WON):
-                        state = GameState.PLAYING
-                elif event.key == pygame.K_t:
-                    show_territory = not show_territory
-                elif event.key == pygame.K_h:
-                    hint_cell = get_hint(
-                        level_state.w,
-                        level_state.h,
-                        frozenset(level_state.walls),
-                        level_state.emitters,
-                        level_state.sinks,
-                        frozenset(),
-                    )
-                elif event.key == pygame.K_w:
-                    if input_mode.set_mode("wall"):
-                        update_caption()
-                elif event.key == pygame.K_s:
-                    if input_mode.set_mode("sink"):
-                        update_caption()
-                elif event.key == pygame.K_e:
-                    if input_mode.placement_mode == "emitter":
-                        input_mode.rotate()
-                    else:
-                        if input_mode.set_mode("emitter"):
-                            update_caption()
-                    update_caption()
-                elif event.key == pygame.K_m:
-                    print(
-                        AsciiRenderer.render(
-                            level_state.w,
-                            level_state.h,
-                            level_state.walls,
-                            level_state.emitters,
-                            level_state.sinks,
-                            {},
-                            show_coords=True,
-                        )
-                    )
-                elif event.key == pygame.K_p:
-                    print(
-                        AsciiRenderer.render(
-                            level_state.w,
-                            level_state.h,
-                            level_state.walls,
-                            level_state.emitters,
-                            level_state.sinks,
-                            water_state.sim_state.water,
-                            show_coords=True,
-                        )
-                    )
-                elif event.key in level_hotkeys:
-                    load_level(level_hotkeys[event.key])
-                elif event.key == pygame.K_TAB:
-                    if state == GameState.EDITOR:
-                        state = GameState.PLAYING
-                        instructions = play_instructions
-                    else:
-                        state = GameState.EDITOR
-                        instructions = editor_instructions
-                    update_caption()
-                elif event.key == pygame.K_s and (pygame.key.get_mods() & pygame.KMOD_CTRL):
-                    save_counter += 1
-                    name = f"{level_state.current_level}_edit{save_counter}"
-                    path = save_level_json(
-                        name,
-                        level_state.w,
-                        level_state.h,
-                        level_state.walls,
-                        level_state.emitters,
-                        level_state.sinks,
-                    )
-                    print(f"Saved level '{name}' to {path}")
-                elif event.key == pygame.K_o and (pygame.key.get_mods() & pygame.KMOD_CTRL):
-                    custom_names = get_custom_level_names()
-                    if custom_names:
-                        name = custom_names[custom_level_index % len(custom_names)]
-                        custom_level_index = (custom_level_index + 1) % len(custom_names)
-                        load_level(name)
+                handler = None
+                if event.mod & pygame.KMOD_CTRL:
+                    handler = ctrl_key_handlers.get(event.key)
+                if handler is None:
+                    handler = key_handlers.get(event.key)
+                if handler is not None:
+                    handler()
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mx, my = pygame.mouse.get_pos()
+                mx, my = event.pos
                 if my < header_height:
                     continue
                 gx, gy = mx // TILE, (my - header_height) // TILE
@@ -579,57 +780,79 @@ def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
                     increment_moves()
                     clear_water_at(gx, gy)
             elif event.type == pygame.MOUSEMOTION:
-                mx, my = pygame.mouse.get_pos()
+                mx, my = event.pos
                 if my < header_height:
                     continue
                 gx, gy = mx // TILE, (my - header_height) // TILE
                 if not (0 <= gx < level_state.w and 0 <= gy < level_state.h):
                     continue
-                buttons = pygame.mouse.get_pressed()
+                buttons = event.buttons
                 if buttons[0]:
-                    apply_action(gx, gy, toggle=False)
+                    pending_drag_cells[(gx, gy)] = None
                 elif buttons[2]:
                     clear_water_at(gx, gy)
+        if pending_drag_cells:
+            flush_drag_edits()
 
         if state == GameState.PLAYING:
-            while step_acc >= STEP_MS:
-                step_acc -= STEP_MS
+            steps = int(step_acc // STEP_MS)
+            if steps > MAX_CATCHUP_STEPS:
+                # Drop the backlog after a stall rather than replaying it all in one frame.
+                steps = MAX_CATCHUP_STEPS
+                step_acc %= STEP_MS
+            else:
+                step_acc -= steps * STEP_MS
+            for _ in range(steps):
                 step_simulation()
+                frame_dirty = True
             if all_sinks_saturated():
                 state = GameState.WON
 
-        sync_water()
+        if sync_water():
+            frame_dirty = True
 
         # Advance and prune pulse animations
-        for pulse in pulses:
-            pulse['age_ms'] += dt
-        pulses[:] = [p for p in pulses if p['age_ms'] < PULSE_DURATION_MS]
+        if pulses:
+            frame_dirty = True
+            for pulse in pulses:
+                pulse['age_ms'] += dt
+            pulses[:] = [p for p in pulses if p['age_ms'] < PULSE_DURATION_MS]
+
+        if not frame_dirty:
+            continue
+        frame_dirty = False
 
         screen = view.screen
-        screen.fill((20, 20, 20))
-        pygame.draw.rect(screen, (30, 30, 30), (0, 0, level_state.w * TILE, header_height))
+        # The board is fully covered by the static layer blit below; only the
+        # header band needs clearing.
+        screen.fill((30, 30, 30), (0, 0, level_state.w * TILE, header_height))
         if state == GameState.EDITOR:
             status_text = "-- EDITOR MODE --"
         elif state == GameState.WON:
             status_text = "All sinks saturated! You win!"
         else:
             status_text = ""
-        header_lines = [f"Moves: {move_count}"] + instructions + [status_text]
-        for idx, line in enumerate(header_lines):
-            if line and idx == len(header_lines) - 1:
+        if move_count != moves_rendered:
+            moves_surf = header_font.render(f"Moves: {move_count}", True, header_text_color)
+            moves_rendered = move_count
+        status_surf = status_surfs.get(status_text)
+        if status_surf is None:
+            if status_text:
                 color = (255, 200, 50) if state == GameState.EDITOR else (120, 220, 120)
             else:
-                color = (200, 200, 200)
-            text = header_font.render(line, True, color)
-            screen.blit(text, (4, header_pad + idx * header_font.get_linesize()))
-
-        grid_surface = screen.subsurface((0, header_height, level_state.w * TILE, level_state.h * TILE))
-        grid_surface.fill((20, 20, 20))
-        view.static_sprites.draw(grid_surface)
-        water_state.connector_sprites.draw(grid_surface)
-        water_state.water_sprites.draw(grid_surface)
+                color = header_text_color
+            status_surf = status_surfs[status_text] = header_font.render(status_text, True, color)
+        header_surfs = [moves_surf] + instruction_surfs + [status_surf]
+        screen.blits(
+            [(text, (4, header_pad + idx * header_linesize)) for idx, text in enumerate(header_surfs)],
+            doreturn=False,
+        )
+
+        grid_surface = view.grid_surface
+        view.draw_static(grid_surface)
+        water_state.draw(grid_surface)
         if show_territory and water_state.sim_state.water:
-            overlay = pygame.Surface((level_state.w * TILE, level_state.h * TILE), pygame.SRCALPHA)
+            overlay = view.clear_overlay()
             # Translucent territory fill per water cell
             for (cx, cy), wcell in water_state.sim_state.water.items():
                 color = level_state.emitter_colors.get(wcell.emitter_id, (200, 200, 200))
@@ -656,15 +879,15 @@ def run_game(initial_level: str = LEVEL_ORDER[0]) -> None:
             cx = pulse['ex'] * TILE + TILE // 2
             cy = pulse['ey'] * TILE + TILE // 2
             ring_size = radius * 2 + 6
-            ring_surf = pygame.Surface((ring_size, ring_size), pygame.SRCALPHA)
-            pygame.draw.circle(ring_surf, (*pulse['color'], alpha), (ring_size // 2, ring_size // 2), radius, 2)
-            grid_surface.blit(ring_surf, (cx - ring_size // 2, cy - ring_size // 2))
+            # Draw into the top-left corner of one shared scratch surface.
+            ring_area = (0, 0, ring_size, ring_size)
+            ring_scratch.fill((0, 0, 0, 0), ring_area)
+            pygame.draw.circle(ring_scratch, (*pulse['color'], alpha), (ring_size // 2, ring_size // 2), radius, 2)
+            grid_surface.blit(ring_scratch, (cx - ring_size // 2, cy - ring_size // 2), ring_area)
         if hint_cell is not None:
             hx, hy = hint_cell
-            hint_surf = pygame.Surface((TILE, TILE), pygame.SRCALPHA)
-            hint_surf.fill((255, 255, 0, 120))
-            grid_surface.blit(hint_surf, (hx * TILE, hy * TILE))
-        draw_coords(grid_surface, level_state.w, level_state.h, font)
+            grid_surface.blit(get_hint_surface(), (hx * TILE, hy * TILE))
+        view.draw_coords(grid_surface)
 
         pygame.display.flip()
 
@@ -9,10 +9,12 @@ connected maze-like layout where every corridor is 1 tile wide.
 
 from __future__ import annotations
 
-from typing import List
+from typing import List, Sequence
 
+_OPEN = ord(".")
 
-def choose_mid(values: List[int]) -> int:
+
+def choose_mid(values: Sequence[int]) -> int:
     return values[len(values) // 2]
 
 
@@ -20,21 +22,25 @@ def make_split_map(width: int = 45, height: int = 21) -> List[str]:
     if width % 2 == 0 or height % 2 == 0:
         raise ValueError("Width and height must be odd to keep corridors 1 tile wide.")
 
-    grid = [["." for _ in range(width)] for _ in range(height)]
-    for x in range(width):
-        grid[0][x] = "#"
-        grid[height - 1][x] = "#"
-    for y in range(height):
-        grid[y][0] = "#"
-        grid[y][width - 1] = "#"
-
-    def divide(x0: int, y0: int, x1: int, y1: int) -> None:
+    # One flat row-major byte buffer: a wall run is a single slice assignment
+    # (stepped by `width` for vertical runs) instead of a per-cell loop.
+    grid = bytearray(b"." * (width * height))
+    grid[0:width] = b"#" * width
+    grid[(height - 1) * width:] = b"#" * width
+    grid[0::width] = b"#" * height
+    grid[width - 1::width] = b"#" * height
+
+    # Regions still to divide, processed depth-first like the recursive form:
+    # the second half is pushed first so the first half is divided first.
+    stack = [(0, 0, width - 1, height - 1)]
+    while stack:
         # Region is between the boundary walls at (x0,y0) inclusive and (x1,y1) inclusive.
         # Only divide if there's room for a wall with openings on both sides.
+        x0, y0, x1, y1 = stack.pop()
         w = x1 - x0
         h = y1 - y0
         if w < 4 or h < 4:
-            return
+            continue
 
         if w > h:
             orientation = "vertical"
@@ -44,36 +50,34 @@ def make_split_map(width: int = 45, height: int = 21) -> List[str]:
             orientation = "vertical"
 
         if orientation == "vertical":
-            possible_walls = [x for x in range(x0 + 2, x1, 2)]
+            possible_walls = range(x0 + 2, x1, 2)
             if not possible_walls:
-                return
+                continue
             wall_x = choose_mid(possible_walls)
-            possible_gaps = [y for y in range(y0 + 1, y1) if y % 2 == 1]
+            possible_gaps = range((y0 + 1) | 1, y1, 2)
             gap_y = choose_mid(possible_gaps)
 
-            for y in range(y0 + 1, y1):
-                grid[y][wall_x] = "#"
-            grid[gap_y][wall_x] = "."
+            grid[(y0 + 1) * width + wall_x:y1 * width:width] = b"#" * (y1 - y0 - 1)
+            grid[gap_y * width + wall_x] = _OPEN
 
-            divide(x0, y0, wall_x, y1)
-            divide(wall_x, y0, x1, y1)
+            stack.append((wall_x, y0, x1, y1))
+            stack.append((x0, y0, wall_x, y1))
         else:
-            possible_walls = [y for y in range(y0 + 2, y1, 2)]
+            possible_walls = range(y0 + 2, y1, 2)
             if not possible_walls:
-                return
+                continue
             wall_y = choose_mid(possible_walls)
-            possible_gaps = [x for x in range(x0 + 1, x1) if x % 2 == 1]
+            possible_gaps = range((x0 + 1) | 1, x1, 2)
             gap_x = choose_mid(possible_gaps)
 
-            for x in range(x0 + 1, x1):
-                grid[wall_y][x] = "#"
-            grid[wall_y][gap_x] = "."
+            row = wall_y * width
+            grid[row + x0 + 1:row + x1] = b"#" * (x1 - x0 - 1)
+            grid[row + gap_x] = _OPEN
 
-            divide(x0, y0, x1, wall_y)
-            divide(x0, wall_y, x1, y1)
+            stack.append((x0, wall_y, x1, y1))
+            stack.append((x0, y0, x1, wall_y))
 
-    divide(0, 0, width - 1, height - 1)
-    return ["".join(row) for row in grid]
+    return [grid[y * width:(y + 1) * width].decode("ascii") for y in range(height)]
 
 
 if __name__ == "__main__":
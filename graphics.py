@@ -1,4 +1,5 @@
 import colorsys
+from functools import lru_cache
 from typing import Mapping
 
 import pygame
@@ -9,18 +10,26 @@ from typedefs import Coord
 TILE = 24
 
 _WALL_SURFACE = None
+_HINT_SURFACE = None
 _SINK_SURFACE_CACHE = {}
 _EMITTER_SURFACE_CACHE = {}
 _WATER_SURFACE_CACHE = {}
 _DEFAULT_SINK_DOT = (20, 10, 10)
 
 
-def _make_surface(color):
-    surface = pygame.Surface((TILE, TILE), pygame.SRCALPHA)
+def _make_surface(color, alpha=True):
+    surface = pygame.Surface((TILE, TILE), pygame.SRCALPHA if alpha else 0)
     surface.fill(color)
     return surface
 
 
+def _display_format(surface, alpha=True):
+    """Convert to the display's pixel format so SDL can use its fastest blitter."""
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
 def _darken(color, factor=0.6):
     r, g, b = color
     return (int(r * factor), int(g * factor), int(b * factor))
@@ -31,6 +40,7 @@ def _lighten(color, factor=1.2):
     return tuple(min(255, int(c * factor)) for c in (r, g, b))
 
 
+@lru_cache(maxsize=None)
 def emitter_color_for_id(eid):
     # Evenly distribute hues using golden ratio to avoid clustering.
     hue = (eid * 0.61803398875) % 1.0
@@ -40,35 +50,57 @@ def emitter_color_for_id(eid):
     return (int(r * 255), int(g * 255), int(b * 255))
 
 
+class _Palette(dict):
+    """eid -> colour, resolved once per sync pass instead of once per cell."""
+
+    def __init__(self, emitter_colors):
+        super().__init__()
+        self.emitter_colors = emitter_colors
+
+    def __missing__(self, eid):
+        color = self.emitter_colors.get(eid)
+        if color is None:
+            color = emitter_color_for_id(eid)
+        self[eid] = color
+        return color
+
+
 def get_wall_surface():
     global _WALL_SURFACE
     if _WALL_SURFACE is None:
-        _WALL_SURFACE = _make_surface((80, 80, 80))
+        _WALL_SURFACE = _display_format(_make_surface((80, 80, 80), alpha=False), alpha=False)
     return _WALL_SURFACE
 
 
+def get_hint_surface():
+    global _HINT_SURFACE
+    if _HINT_SURFACE is None:
+        _HINT_SURFACE = _display_format(_make_surface((255, 255, 0, 120)))
+    return _HINT_SURFACE
+
+
 def get_sink_surface(dot_color=None):
     color = dot_color if dot_color is not None else _DEFAULT_SINK_DOT
     surface = _SINK_SURFACE_CACHE.get(color)
     if surface is None:
-        surface = _make_surface((70, 30, 30))
+        surface = _make_surface((70, 30, 30), alpha=False)
         center = (TILE // 2, TILE // 2)
         pygame.draw.circle(surface, color, center, TILE // 4)
-        _SINK_SURFACE_CACHE[color] = surface
+        surface = _SINK_SURFACE_CACHE[color] = _display_format(surface, alpha=False)
     return surface
 
 
 def get_emitter_surface(dx, dy, color):
     key = (dx, dy, color)
     if key not in _EMITTER_SURFACE_CACHE:
-        surface = _make_surface(color)
+        surface = _make_surface(color, alpha=False)
         center = (TILE // 2, TILE // 2)
         arrow_end = (
             center[0] + dx * (TILE // 3),
             center[1] + dy * (TILE // 3),
         )
         pygame.draw.line(surface, _darken(color, 0.5), center, arrow_end, 3)
-        _EMITTER_SURFACE_CACHE[key] = surface
+        _EMITTER_SURFACE_CACHE[key] = _display_format(surface, alpha=False)
     return _EMITTER_SURFACE_CACHE[key]
 
 
@@ -114,7 +146,7 @@ def get_water_surface(dx, dy, color, age=0, decay_steps=1, prefer_left=True, pre
         if pressured:
             ring_color = _lighten(draw_color, 1.6)
             pygame.draw.circle(surface, (*ring_color, min(255, alpha + 60)), center, TILE // 3, 2)
-        _WATER_SURFACE_CACHE[key] = surface
+        _WATER_SURFACE_CACHE[key] = _display_format(surface)
     return _WATER_SURFACE_CACHE[key]
 
 
@@ -181,8 +213,23 @@ class WaterSprite(TileSprite):
             self.rect.topleft = (x * TILE, y * TILE)
 
 
+# Water sprites released by sync_water_sprites, reused before constructing new ones.
+_WATER_SPRITE_POOL = []
+
+
+def acquire_water(x, y, dx, dy, color, age=0, decay_steps=1, prefer_left=True, pressured=False):
+    if _WATER_SPRITE_POOL:
+        sprite = _WATER_SPRITE_POOL.pop()
+        sprite.update_state(x, y, dx, dy, color, age, decay_steps, prefer_left, pressured)
+        return sprite
+    return WaterSprite(x, y, dx, dy, color, age, decay_steps, prefer_left, pressured)
+
+
+def release_water(sprite):
+    _WATER_SPRITE_POOL.append(sprite)
+
+
 def build_static_sprites(walls, sinks, emitters, emitter_colors):
-    static_sprites = pygame.sprite.Group()
     wall_lookup = {}
     sink_lookup = {}
     emitter_lookup = {}
@@ -190,41 +237,38 @@ def build_static_sprites(walls, sinks, emitters, emitter_colors):
     for (x, y) in walls:
         sprite = WallSprite(x, y)
         wall_lookup[(x, y)] = sprite
-        static_sprites.add(sprite)
     for (x, y) in sinks:
         sprite = SinkSprite(x, y)
         sink_lookup[(x, y)] = sprite
-        static_sprites.add(sprite)
     for emitter in emitters:
         color = emitter_colors.get(emitter.id)
         if color is None:
             color = emitter_color_for_id(emitter.id)
         sprite = EmitterSprite(emitter, color)
         emitter_lookup[(emitter.x, emitter.y)] = (emitter, sprite)
-        static_sprites.add(sprite)
-    return static_sprites, wall_lookup, sink_lookup, emitter_lookup
+    return wall_lookup, sink_lookup, emitter_lookup
 
 
 def sync_water_sprites(
     water_state: Mapping[Coord, WaterCell],
-    water_group,
+    water_sprites,
     emitter_colors,
     decay_steps: int = 1,
 ):
-    existing = {(sprite.grid_pos): sprite for sprite in water_group.sprites()}
-    missing = set(existing.keys()) - set(water_state.keys())
-    for pos in missing:
-        existing[pos].kill()
-        existing.pop(pos, None)
+    """Update a {pos: WaterSprite} dict in place to match water_state."""
+    # Key-view difference runs in C; only the vanished cells are touched.
+    for pos in water_sprites.keys() - water_state.keys():
+        release_water(water_sprites.pop(pos))
 
+    palette = _Palette(emitter_colors)
     for (x, y), cell in water_state.items():
         dx, dy, eid, age = cell.dx, cell.dy, cell.emitter_id, cell.age
         prefer_left = cell.prefer_left
         pressured = cell.pressured
-        color = emitter_colors.get(eid, emitter_color_for_id(eid))
-        sprite = existing.get((x, y))
+        color = palette[eid]
+        sprite = water_sprites.get((x, y))
         if sprite is None:
-            water_group.add(WaterSprite(x, y, dx, dy, color, age, decay_steps, prefer_left, pressured))
+            water_sprites[(x, y)] = acquire_water(x, y, dx, dy, color, age, decay_steps, prefer_left, pressured)
         else:
             sprite.update_state(x, y, dx, dy, color, age, decay_steps, prefer_left, pressured)
 
@@ -257,34 +301,44 @@ class ConnectorSprite(pygame.sprite.Sprite):
 
 def sync_connector_sprites(
     water_state: Mapping[Coord, WaterCell],
-    connector_group,
+    connector_sprites,
     emitter_colors,
 ):
-    existing = {sprite.key: sprite for sprite in connector_group.sprites()}
+    """Update a {(x, y, dx, dy): ConnectorSprite} dict in place to match water_state."""
     needed = {}
+    palette = _Palette(emitter_colors)
     for (x, y), cell in water_state.items():
         eid = cell.emitter_id
-        color = emitter_colors.get(eid, emitter_color_for_id(eid))
-        for dx, dy in [(1, 0), (0, 1)]:
-            neighbor = (x + dx, y + dy)
-            if neighbor in water_state and water_state[neighbor].emitter_id == eid:
-                key = (x, y, dx, dy)
-                needed[key] = (x, y, dx, dy, color)
-
-    for key in set(existing.keys()) - set(needed.keys()):
-        existing[key].kill()
-
-    for key, (x, y, dx, dy, color) in needed.items():
-        if key not in existing:
-            connector_group.add(ConnectorSprite(x, y, dx, dy, color))
+        color = palette[eid]
+        right = water_state.get((x + 1, y))
+        if right is not None and right.emitter_id == eid:
+            needed[(x, y, 1, 0)] = color
+        down = water_state.get((x, y + 1))
+        if down is not None and down.emitter_id == eid:
+            needed[(x, y, 0, 1)] = color
+
+    for key in connector_sprites.keys() - needed.keys():
+        del connector_sprites[key]
+
+    for key, color in needed.items():
+        sprite = connector_sprites.get(key)
+        if sprite is None:
+            connector_sprites[key] = ConnectorSprite(*key, color)
         else:
-            existing[key].update_color(color)
+            sprite.update_color(color)
 
 
-def sync_sink_sprites(sink_lookup, sink_claims, emitter_colors):
-    for pos, sprite in sink_lookup.items():
+def sync_sink_sprites(sink_lookup, sink_claims, emitter_colors, positions=None):
+    """Set each sink's dot to its owner's colour; limit to `positions` if given."""
+    palette = _Palette(emitter_colors)
+    if positions is None:
+        positions = sink_lookup.keys()
+    for pos in positions:
+        sprite = sink_lookup.get(pos)
+        if sprite is None:
+            continue
         owner = sink_claims.get(pos)
         dot_color = None
         if owner is not None:
-            dot_color = emitter_colors.get(owner, emitter_color_for_id(owner))
+            dot_color = palette[owner]
         sprite.set_dot_color(dot_color)
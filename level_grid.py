@@ -0,0 +1,110 @@
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from typedefs import CellIndex, Coord
+
+# Per-cell flag bits for the static parts of a level.
+WALL = 1
+SINK = 2
+EMITTER = 4
+BLOCKS_WATER = WALL | EMITTER
+
+# Side-step order for a cell whose forward move is blocked, indexed by
+# dir_idx * 2 + prefer_left: the preferred perpendicular first, then the other.
+_TURN_ORDER = tuple(
+    ((dy, -dx), (-dy, dx)) if prefer_left else ((-dy, dx), (dy, -dx))
+    for dx in (-1, 0, 1)
+    for dy in (-1, 0, 1)
+    for prefer_left in (False, True)
+)
+
+# (target, dx, dy, prefer_left, sink) for one move a cell may try; sink is the
+# target's coordinate when it is a sink (open only to its claiming emitter).
+StepOption = Tuple[CellIndex, int, int, bool, Optional[Coord]]
+
+
+def build_flags(w: int, h: int, walls, emitters, sinks) -> bytearray:
+    """Pack walls, sinks and emitters into one flag byte per cell (row-major)."""
+    flags = bytearray(w * h)
+    for (x, y) in walls:
+        flags[y * w + x] |= WALL
+    for (x, y) in sinks:
+        flags[y * w + x] |= SINK
+    for e in emitters:
+        flags[e.y * w + e.x] |= EMITTER
+    return flags
+
+
+def step_key(idx: CellIndex, dir_idx: int, prefer_left: bool) -> int:
+    """Key into LevelGrid.step_table for a cell, its dir_idx and its preference."""
+    return (idx * 9 + dir_idx) * 2 + prefer_left
+
+
+class LevelGrid:
+    """Row-major flag grid (one byte per cell) built from a level's static sets."""
+
+    def __init__(self, w: int, h: int, walls, emitters, sinks):
+        self.w = w
+        self.h = h
+        self.walls: FrozenSet[Coord] = frozenset(walls)
+        self.sinks: FrozenSet[Coord] = frozenset(sinks)
+        self.emitters: Tuple = tuple(emitters)
+        self.flags = build_flags(w, h, self.walls, self.emitters, self.sinks)
+        # One shared (x, y) tuple per cell, by flat index, so turning indices
+        # back into coordinate keys allocates nothing.
+        self.coords: Tuple[Coord, ...] = tuple((x, y) for y in range(h) for x in range(w))
+        # (target, dx, dy, emitter_id) for every emitter whose target cell is in
+        # bounds and open; the others can never spawn until the level is edited.
+        self.emitter_spawns: Tuple[Tuple[Coord, int, int, int], ...] = tuple(
+            ((e.x + e.dx, e.y + e.dy), e.dx, e.dy, e.id)
+            for e in self.emitters
+            if 0 <= e.x + e.dx < w
+            and 0 <= e.y + e.dy < h
+            and not self.flags[(e.y + e.dy) * w + e.x + e.dx]
+        )
+        # Memoised step_options results keyed by step_key; the grid is rebuilt
+        # on every level edit, so entries never go stale.
+        self.step_table: Dict[int, Tuple[StepOption, ...]] = {}
+
+    def step_options(self, x: int, y: int, dx: int, dy: int, prefer_left: bool) -> Tuple[StepOption, ...]:
+        """Moves a cell at (x, y) heading (dx, dy) may try, best first.
+
+        Forward, then the preferred side, then the other side (a turn flips
+        prefer_left), keeping only in-bounds targets that are not walls or
+        emitters. Sink claims change every tick, so sinks are kept and marked
+        for the caller to check. An empty result means the cell stays put.
+        Hot callers probe step_table themselves and only call this on a miss.
+        """
+        key = step_key(y * self.w + x, (dx + 1) * 3 + dy + 1, prefer_left)
+        options = self.step_table.get(key)
+        if options is None:
+            w, h, flags = self.w, self.h, self.flags
+            tries = [(dx, dy, prefer_left)]
+            tries.extend(
+                (ndx, ndy, not prefer_left)
+                for ndx, ndy in _TURN_ORDER[((dx + 1) * 3 + dy + 1) * 2 + prefer_left]
+            )
+            found = []
+            for ndx, ndy, npref in tries:
+                nx, ny = x + ndx, y + ndy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                tgt = ny * w + nx
+                f = flags[tgt]
+                if f & BLOCKS_WATER:
+                    continue
+                found.append((tgt, ndx, ndy, npref, (nx, ny) if f & SINK else None))
+            options = self.step_table[key] = tuple(found)
+        return options
+
+    def matches(self, w: int, h: int, walls, emitters, sinks) -> bool:
+        # Callers mutate their wall/sink sets in place between ticks, so compare
+        # contents (a C-level set comparison) rather than object identity.
+        return (
+            w == self.w
+            and h == self.h
+            and len(walls) == len(self.walls)
+            and len(sinks) == len(self.sinks)
+            and walls == self.walls
+            and sinks == self.sinks
+            and tuple(emitters) == self.emitters
+        )
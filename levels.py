@@ -1,6 +1,7 @@
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 
 CUSTOM_LEVELS_DIR = "custom_levels"
 
@@ -223,9 +224,16 @@ class Emitter:
     y: int
     dx: int
     dy: int
+    # ASCII glyph (as a byte) for this emitter's direction, fixed at construction
+    # so renderers never look it up per frame.
+    char_byte: int = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        object.__setattr__(self, "char_byte", ord(DIR_TO_CHAR.get((self.dx, self.dy), "E")))
 
-def parse_level(lines):
+
+@lru_cache(maxsize=64)
+def _parse_level_frozen(lines):
     h = len(lines)
     w = max(len(r) for r in lines)
     walls = set()
@@ -240,7 +248,14 @@ def parse_level(lines):
                 emitters.append(Emitter(len(emitters), x, y, dx, dy))
             elif ch == SINK:
                 sinks.add((x, y))
-    return w, h, walls, emitters, sinks
+    return w, h, frozenset(walls), tuple(emitters), frozenset(sinks)
+
+
+def parse_level(lines):
+    # Parsing is memoised on the level text; callers edit what they get back
+    # in place, so each call hands out fresh wall/sink sets and emitter list.
+    w, h, walls, emitters, sinks = _parse_level_frozen(tuple(lines))
+    return w, h, set(walls), list(emitters), set(sinks)
 
 
 def get_level(name):
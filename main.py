@@ -1,12 +1,10 @@
 import argparse
-import math
 
 from ascii_renderer import AsciiRenderer
 from dsl import run_script
 from game import run_game
 from levels import LEVEL_ORDER, LEVELS, get_level, parse_level
-from simulation_constants import STEP_MS
-from simulation_engine import SimulationEngine
+from simulation_engine import SimulationEngine, steps_for_ms
 from simulation_state import SimulationState
 
 _ENGINE = SimulationEngine()
@@ -15,7 +13,7 @@ _ENGINE = SimulationEngine()
 def run_headless(duration_ms, level_lines) -> None:
     state = SimulationState()
     w, h, walls, emitters, sinks = parse_level(level_lines)
-    steps = max(1, int(math.ceil(duration_ms / float(STEP_MS))))
+    steps = steps_for_ms(duration_ms)
     for _ in range(steps):
         _ENGINE.tick(w, h, walls, emitters, sinks, state)
     print(f"Simulated {steps} steps (~{duration_ms} ms)")
@@ -1,7 +1,16 @@
-from typing import Dict, Iterable, List, Mapping, MutableMapping, Set, Tuple
+from typing import AbstractSet, Dict, List, Mapping, Set, Tuple
 
+from level_grid import SINK, LevelGrid
 from simulation_state import SimulationState, WaterCell
-from typedefs import Coord
+from typedefs import CellIndex, Coord
+
+# (target, dx, dy, emitter_id, prefer_left) proposed for one source cell.
+Proposal = Tuple[CellIndex, int, int, int, bool]
+# (target, dx, dy, emitter_id, prefer_left) chosen for one source cell.
+Edge = Tuple[CellIndex, int, int, int, bool]
+
+# Marks a cell on the move chain currently being walked by _resolve_moves.
+_ON_WALK = object()
 
 
 def in_bounds(x: int, y: int, w: int, h: int) -> bool:
@@ -9,222 +18,271 @@ def in_bounds(x: int, y: int, w: int, h: int) -> bool:
 
 
 class MovementResolver:
-    def __init__(self, w: int, h: int, walls: Set[Coord], emitters, sinks: Set[Coord], state: SimulationState):
-        self.w = w
-        self.h = h
-        self.walls = walls
-        self.emitters = list(emitters)
-        self.sinks = sinks
+    """Resolves one tick of water movement.
+
+    Everything from build_proposals on is keyed by flat cell index (y * w + x)
+    rather than (x, y) tuples, including the next-tick water advance_water
+    hands back; WaterPruner turns it back into coordinate keys.
+    """
+
+    def __init__(self, grid: LevelGrid, state: SimulationState):
+        self.grid = grid
+        self.w = grid.w
+        # Inflow is one set of ints, emitter_id * cell_count + cell, rather than
+        # a set of emitter IDs per cell. Cells are below cell_count, so the
+        # packing is exact for any emitter ID, however large the editor's
+        # counter grows.
+        self.cell_count = grid.w * grid.h
+        self.flags = grid.flags
+        self.coords = grid.coords
         self.state = state
-        self.emitter_positions = {(e.x, e.y) for e in self.emitters}
-        self.prev_owner = {pos: cell.emitter_id for pos, cell in state.water.items()}
+        self.emitter_spawns = grid.emitter_spawns
         self.spawned_positions: Set[Coord] = set()
+        # Water by flat index, filled by build_proposals once spawning is done.
+        self.cells: Dict[CellIndex, WaterCell] = {}
 
-    def spawn_from_emitters(self, occupied: Set[Coord]) -> None:
-        self.spawned_positions.clear()
-        for emitter in self.emitters:
-            tx, ty = emitter.x + emitter.dx, emitter.y + emitter.dy
-            if not in_bounds(tx, ty, self.w, self.h):
-                continue
-            if (tx, ty) in self.walls or (tx, ty) in occupied or (tx, ty) in self.emitter_positions:
-                continue
-            if (tx, ty) in self.sinks:
+    def spawn_from_emitters(self) -> None:
+        # Bounds and wall/sink/emitter checks on each target were done once by
+        # the LevelGrid; only occupancy changes from tick to tick.
+        spawned = self.spawned_positions
+        spawned.clear()
+        water = self.state.water
+        for target, dx, dy, eid in self.emitter_spawns:
+            if target in water:
                 continue
-            self.state.water[(tx, ty)] = WaterCell(emitter.dx, emitter.dy, 0, emitter.id, True)
-            occupied.add((tx, ty))
-            self.spawned_positions.add((tx, ty))
-
-    def _propose_move(self, position: Coord, cell: WaterCell):
-        x, y = position
-        fx, fy = x + cell.dx, y + cell.dy
-        forward_blocked = (
-            not in_bounds(fx, fy, self.w, self.h)
-            or (fx, fy) in self.walls
-            or (fx, fy) in self.emitter_positions
-        )
-
-        if (fx, fy) in self.sinks:
-            owner = self.state.sink_claims.get((fx, fy))
-            if owner is not None and owner != cell.emitter_id:
-                forward_blocked = True
-
-        if not forward_blocked:
-            return position, (fx, fy, cell.dx, cell.dy, cell.emitter_id, cell.prefer_left)
-
-        ldx, ldy = cell.dy, -cell.dx
-        rdx, rdy = -cell.dy, cell.dx
-        turn_order = ((ldx, ldy), (rdx, rdy)) if cell.prefer_left else ((rdx, rdy), (ldx, ldy))
-        for ndx, ndy in turn_order:
-            nx, ny = x + ndx, y + ndy
-            if not in_bounds(nx, ny, self.w, self.h):
-                continue
-            if (nx, ny) in self.walls or (nx, ny) in self.emitter_positions:
-                continue
-            if (nx, ny) in self.sinks:
-                owner = self.state.sink_claims.get((nx, ny))
-                if owner is not None and owner != cell.emitter_id:
-                    continue
-            return position, (nx, ny, ndx, ndy, cell.emitter_id, not cell.prefer_left)
+            water[target] = WaterCell(dx, dy, 0, eid, True)
+            spawned.add(target)
 
-        return position, (x, y, cell.dx, cell.dy, cell.emitter_id, cell.prefer_left)
-
-    def build_proposals(self) -> Dict[Coord, Tuple[int, int, int, int, int, bool]]:
-        proposals: Dict[Coord, Tuple[int, int, int, int, int, bool]] = {}
-        for position, cell in list(self.state.water.items()):
-            src, proposal = self._propose_move(position, cell)
-            proposals[src] = proposal
+    def build_proposals(self) -> Dict[CellIndex, Proposal]:
+        # Runs once per water cell per tick. Which moves a cell may try depends
+        # only on the static level, so it comes from the grid's memoised
+        # step_options; only sink claims are checked here. The first option
+        # that is open wins; with none the cell stays put.
+        w = self.w
+        step_table, step_options = self.grid.step_table, self.grid.step_options
+        sink_claims = self.state.sink_claims
+        cells = self.cells
+        cells.clear()
+        proposals: Dict[CellIndex, Proposal] = {}
+        for (x, y), cell in self.state.water.items():
+            src = y * w + x
+            cells[src] = cell
+            dx, dy, eid, prefer_left = cell.dx, cell.dy, cell.emitter_id, cell.prefer_left
+            # step_key, inlined.
+            options = step_table.get((src * 9 + cell.dir_idx) * 2 + prefer_left)
+            if options is None:
+                options = step_options(x, y, dx, dy, prefer_left)
+            for tgt, ndx, ndy, npref, sink in options:
+                if sink is not None:
+                    owner = sink_claims.get(sink)
+                    if owner is not None and owner != eid:
+                        continue
+                proposals[src] = (tgt, ndx, ndy, eid, npref)
+                break
+            else:
+                proposals[src] = (src, dx, dy, eid, prefer_left)
         return proposals
 
     @staticmethod
-    def group_targets(proposals: Mapping[Coord, Tuple[int, int, int, int, int, bool]]) -> Dict[Coord, List[Tuple[Coord, int, int, int, bool]]]:
-        targets: Dict[Coord, List[Tuple[Coord, int, int, int, bool]]] = {}
-        for src, (nx, ny, ndx, ndy, eid, pref_left) in proposals.items():
-            targets.setdefault((nx, ny), []).append((src, ndx, ndy, eid, pref_left))
-        return targets
+    def group_targets(
+        proposals: Mapping[CellIndex, Proposal],
+    ) -> Tuple[Dict[CellIndex, CellIndex], Dict[CellIndex, List[CellIndex]]]:
+        """Group proposals by target as (first_mover, contested).
 
-    @staticmethod
-    def build_inflow_targets(targets: Mapping[Coord, Iterable[Tuple[Coord, int, int, int, bool]]]) -> Dict[Coord, Set[int]]:
-        inflow_targets: Dict[Coord, Set[int]] = {}
-        for tgt, movers in targets.items():
-            incoming_ids = {eid for (src, _ndx, _ndy, eid, _pref) in movers if src != tgt}
-            if incoming_ids:
-                inflow_targets[tgt] = incoming_ids
-        return inflow_targets
-
-    def _select_edges(self, targets: Mapping[Coord, List[Tuple[Coord, int, int, int, bool]]]) -> Dict[Coord, Tuple[Coord, int, int, int, bool]]:
-        edges: Dict[Coord, Tuple[Coord, int, int, int, bool]] = {}
-        for tgt, movers in targets.items():
-            if tgt in self.sinks:
-                if len(movers) == 1:
-                    src, ndx, ndy, eid, pref_left = movers[0]
+        first_mover maps every proposed target to its first source, in proposal
+        order. Nearly all targets have only that one mover, so lists are built
+        only for contested targets: contested maps those to all of their
+        sources, first one included, in proposal order.
+        """
+        first_mover: Dict[CellIndex, CellIndex] = {}
+        contested: Dict[CellIndex, List[CellIndex]] = {}
+        claim = first_mover.setdefault
+        for src, proposal in proposals.items():
+            tgt = proposal[0]
+            first = claim(tgt, src)
+            if first != src:
+                srcs = contested.get(tgt)
+                if srcs is None:
+                    contested[tgt] = [first, src]
                 else:
-                    src, ndx, ndy, eid, pref_left = min(
-                        movers,
-                        key=lambda m: (
-                            0 if self.state.sink_claims.get(tgt) == m[3] else 1,
-                            m[0][1],
-                            m[0][0],
-                        ),
-                    )
-                self.state.sink_claims[tgt] = eid
-                edges[src] = (tgt, ndx, ndy, eid, pref_left)
-                continue
+                    srcs.append(src)
+        return first_mover, contested
+
+    def build_inflow_targets(self, proposals: Mapping[CellIndex, Proposal]) -> Set[int]:
+        """Every (target, emitter_id) with water moving in, packed as emitter_id * cell_count + target."""
+        n = self.cell_count
+        return {p[3] * n + p[0] for src, p in proposals.items() if p[0] != src}
 
-            if len(movers) == 1:
-                src, ndx, ndy, eid, pref_left = movers[0]
-                edges[src] = (tgt, ndx, ndy, eid, pref_left)
+    def _select_edges(
+        self,
+        first_mover: Mapping[CellIndex, CellIndex],
+        contested: Mapping[CellIndex, List[CellIndex]],
+        proposals: Mapping[CellIndex, Proposal],
+    ) -> Dict[CellIndex, Edge]:
+        # A winning proposal already has the Edge shape, so it is stored as is.
+        flags, cells, coords = self.flags, self.cells, self.coords
+        sink_claims = self.state.sink_claims
+        edges: Dict[CellIndex, Edge] = {}
+        for tgt, src in first_mover.items():
+            srcs = contested.get(tgt)
+            if srcs is None:
+                if flags[tgt] & SINK:
+                    sink_claims[coords[tgt]] = proposals[src][3]
+                edges[src] = proposals[src]
+                continue
+            if flags[tgt] & SINK:
+                sink = coords[tgt]
+                owner = sink_claims.get(sink)
+                # The claiming emitter's lowest source wins, else the lowest
+                # source; flat indices order the same as (y, x), so the
+                # row-major tie-break holds.
+                owned = [s for s in srcs if proposals[s][3] == owner]
+                src = min(owned) if owned else min(srcs)
+                sink_claims[sink] = proposals[src][3]
+                edges[src] = proposals[src]
                 continue
-            occupant_eid = self.prev_owner.get(tgt)
-            unique_eids = {eid for (_src, _ndx, _ndy, eid, _pref) in movers}
-            single_emitter = len(unique_eids) == 1
-            same_eid_incoming = any(
-                src != tgt and eid == occupant_eid for (src, _ndx, _ndy, eid, _pref) in movers
-            )
-
-            def priority(move: Tuple[Coord, int, int, int, bool]) -> Tuple[int, int, int, int]:
-                src, ndx, ndy, eid, pref_left = move
-                cell = self.state.water.get(src, WaterCell(ndx, ndy, 0, eid, pref_left))
-                straight = (ndx, ndy) == (cell.dx, cell.dy)
-                owner_bonus = 0 if (single_emitter or self.prev_owner.get(tgt) == eid) else 1
-                stay_penalty = 1 if (src == tgt and same_eid_incoming) else 0
-                return (stay_penalty, owner_bonus, 0 if straight else 1, src[1], src[0])
-
-            src, ndx, ndy, eid, pref_left = min(movers, key=priority)
-            edges[src] = (tgt, ndx, ndy, eid, pref_left)
+
+            # Contested target: lowest (stay_penalty, owner_bonus, turned, src)
+            # wins, compared in an explicit loop rather than min() over a key
+            # closure rebuilt for every target. The owner is the target's
+            # occupant before this tick's spawns.
+            occupant = cells.get(tgt)
+            if occupant is None or coords[tgt] in self.spawned_positions:
+                occupant_eid = None
+            else:
+                occupant_eid = occupant.emitter_id
+            single_emitter = len({proposals[src][3] for src in srcs}) == 1
+            same_eid_incoming = any(src != tgt and proposals[src][3] == occupant_eid for src in srcs)
+            best_key = None
+            for src in srcs:
+                _tgt, ndx, ndy, eid, _pref = proposals[src]
+                cell = cells[src]
+                key = (
+                    1 if (src == tgt and same_eid_incoming) else 0,
+                    0 if (single_emitter or occupant_eid == eid) else 1,
+                    0 if (ndx == cell.dx and ndy == cell.dy) else 1,
+                    src,
+                )
+                if best_key is None or key < best_key:
+                    best_key = key
+            src = best_key[3]
+            edges[src] = proposals[src]
         return edges
 
-    def _move_succeeds(
+    def _resolve_moves(
         self,
-        src: Coord,
-        edges: Mapping[Coord, Tuple[Coord, int, int, int, bool]],
-        occupied_now: Set[Coord],
-        memo: Dict[Coord, bool],
-        visiting: Set[Coord],
-    ) -> bool:
-        if src in memo:
-            return memo[src]
-        if src not in edges:
-            memo[src] = False
-            return False
-        tgt, _ndx, _ndy, _eid, _pref = edges[src]
-        if tgt in self.sinks:
-            memo[src] = True
-            return True
-        if tgt not in occupied_now:
-            memo[src] = True
-            return True
-        if tgt == src:
-            memo[src] = True
-            return True
-        if tgt in visiting:
-            memo[src] = True
-            return True
-        visiting.add(tgt)
-        memo[src] = self._move_succeeds(tgt, edges, occupied_now, memo, visiting)
-        visiting.remove(tgt)
-        return memo[src]
+        edges: Mapping[CellIndex, Edge],
+        occupied_now: AbstractSet[CellIndex],
+    ) -> Dict[CellIndex, bool]:
+        """Whether each source's chosen move goes through, in one sweep over edges.
+
+        From each unresolved source, follow the chain of moves src -> tgt -> ...
+        until it ends: at a resolved cell, a cell with no chosen move (fails), a
+        sink, an empty cell or a cell staying put (succeeds), or a cell already
+        on this chain (a rotating cycle, succeeds). Every cell walked shares
+        that outcome, so each cell is walked once per tick.
+        """
+        flags = self.flags
+        # A cell's entry is _ON_WALK while the current walk passes through it,
+        # so reaching it again is the cycle test; no per-walk visited set.
+        succeeds: Dict[CellIndex, object] = {}
+        get = succeeds.get
+        path: List[CellIndex] = []
+        for src in edges:
+            if src in succeeds:
+                continue
+            node = src
+            while True:
+                edge = edges.get(node)
+                if edge is None:
+                    result = False
+                    break
+                tgt = edge[0]
+                if flags[tgt] & SINK or tgt not in occupied_now or tgt == node:
+                    result = True
+                    break
+                path.append(node)
+                succeeds[node] = _ON_WALK
+                seen = get(tgt)
+                if seen is not None:
+                    result = True if seen is _ON_WALK else seen
+                    break
+                node = tgt
+            succeeds[node] = result
+            for cell in path:
+                succeeds[cell] = result
+            path.clear()
+        return succeeds
 
     def advance_water(
         self,
-        edges: Mapping[Coord, Tuple[Coord, int, int, int, bool]],
-        inflow_targets: Mapping[Coord, Set[int]],
+        edges: Mapping[CellIndex, Edge],
+        inflow_targets: AbstractSet[int],
         decay_steps: int,
-    ) -> Dict[Coord, WaterCell]:
-        next_water: Dict[Coord, WaterCell] = {}
-        memo: Dict[Coord, bool] = {}
-        visiting: Set[Coord] = set()
-        occupied_now = set(self.state.water.keys())
+    ) -> Dict[CellIndex, WaterCell]:
+        next_water: Dict[CellIndex, WaterCell] = {}
+        cells = self.cells
+        # Water is not mutated while moves resolve, so its key view is the
+        # occupancy set; no per-tick copy.
+        succeeds = self._resolve_moves(edges, cells.keys())
 
         # Identify cells that are under same-emitter backpressure so they do not
         # decay just because the front of the queue is momentarily blocked.
-        same_eid_pressure: Set[Coord] = set()
-        for tgt, incoming_ids in inflow_targets.items():
-            cell = self.state.water.get(tgt)
-            if cell and cell.emitter_id in incoming_ids:
+        n = self.cell_count
+        same_eid_pressure: Set[CellIndex] = set()
+        for key in inflow_targets:
+            eid, tgt = divmod(key, n)
+            cell = cells.get(tgt)
+            if cell and cell.emitter_id == eid:
                 same_eid_pressure.add(tgt)
-        deps: Dict[Coord, List[Coord]] = {}
+        flags = self.flags
+        deps: Dict[CellIndex, List[CellIndex]] = {}
         for src, (tgt, _ndx, _ndy, eid, _pref) in edges.items():
-            if tgt in self.sinks or tgt == src:
+            if flags[tgt] & SINK or tgt == src:
                 continue
-            occupant = self.state.water.get(tgt)
+            occupant = cells.get(tgt)
             if occupant and occupant.emitter_id == eid:
                 deps.setdefault(tgt, []).append(src)
 
-        stack: List[Coord] = list(same_eid_pressure)
+        stack: List[CellIndex] = list(same_eid_pressure)
         while stack:
             tgt = stack.pop()
             for src in deps.get(tgt, []):
-                cell = self.state.water.get(src)
+                cell = cells.get(src)
                 if cell is None:
                     continue
                 # Only propagate pressure to a source that itself is being fed
                 # (i.e., another cell is trying to move into it). This prevents
                 # pressure from flowing all the way back to an idle emitter when
                 # the line is effectively empty.
-                if cell.emitter_id not in inflow_targets.get(src, set()):
+                if cell.emitter_id * n + src not in inflow_targets:
                     continue
                 if src not in same_eid_pressure:
                     same_eid_pressure.add(src)
                     stack.append(src)
 
-        for (x, y), cell in self.state.water.items():
-            if (x, y) in edges and self._move_succeeds((x, y), edges, occupied_now, memo, visiting):
-                (nx, ny), ndx, ndy, neid, npref = edges[(x, y)]
-                if (nx, ny) not in self.sinks:
-                    moved = (nx, ny) != (x, y)
-                    if moved:
+        # Per-cell kernel: no calls besides the WaterCell constructor, everything
+        # it touches is a local, and each cell's edge is fetched once.
+        edges_get = edges.get
+        make_cell = WaterCell
+        for src, cell in cells.items():
+            edge = edges_get(src)
+            if edge is not None and succeeds[src]:
+                tgt, ndx, ndy, neid, npref = edge
+                if not flags[tgt] & SINK:
+                    if tgt != src:
+                        new_age = 0
+                    elif neid * n + tgt in inflow_targets or tgt in same_eid_pressure:
                         new_age = 0
                     else:
-                        inflow_ids = inflow_targets.get((nx, ny), set())
-                        pressured = (nx, ny) in same_eid_pressure
-                        new_age = 0 if (neid in inflow_ids or pressured) else cell.age + 1
+                        new_age = cell.age + 1
                     if new_age < decay_steps:
-                        next_water[(nx, ny)] = WaterCell(ndx, ndy, new_age, neid, npref, False)
+                        next_water[tgt] = make_cell(ndx, ndy, new_age, neid, npref, False)
             else:
-                inflow_ids = inflow_targets.get((x, y), set())
-                pressured = (x, y) in same_eid_pressure
-                new_age = 0 if (cell.emitter_id in inflow_ids or pressured) else cell.age + 1
+                eid = cell.emitter_id
+                pressured = src in same_eid_pressure
+                new_age = 0 if (pressured or eid * n + src in inflow_targets) else cell.age + 1
                 if new_age < decay_steps:
-                    next_water[(x, y)] = WaterCell(cell.dx, cell.dy, new_age, cell.emitter_id, cell.prefer_left, pressured)
+                    next_water[src] = make_cell(cell.dx, cell.dy, new_age, eid, cell.prefer_left, pressured)
 
         return next_water
@@ -1,20 +1,43 @@
-import math
-from typing import Set
+from typing import Optional, Set
 
+from level_grid import LevelGrid
 from movement_resolver import MovementResolver
 from simulation_constants import STATIONARY_DECAY_MS, STEP_MS
 from simulation_state import SimulationState
 from water_pruner import WaterPruner
 
 
+def steps_for_ms(ms: int, step_ms: int = STEP_MS) -> int:
+    """Whole simulation steps needed to cover ms milliseconds (at least one)."""
+    return max(1, -(-ms // step_ms))
+
+
 class SimulationEngine:
     def __init__(self, step_ms: int = STEP_MS, decay_ms: int = STATIONARY_DECAY_MS):
         self.step_ms = step_ms
         self.decay_ms = decay_ms
+        # Ticks a stationary cell survives; fixed for the engine's lifetime.
+        self.decay_steps = steps_for_ms(decay_ms, step_ms)
+        self._grid: Optional[LevelGrid] = None
+        self._resolver: Optional[MovementResolver] = None
+
+    def level_grid(self, w: int, h: int, walls, emitters, sinks) -> LevelGrid:
+        """Return the flag grid for this level, rebuilding it only after an edit."""
+        grid = self._grid
+        if grid is None or not grid.matches(w, h, walls, emitters, sinks):
+            grid = self._grid = LevelGrid(w, h, walls, emitters, sinks)
+        return grid
 
-    @property
-    def decay_steps(self) -> int:
-        return max(1, int(math.ceil(self.decay_ms / float(self.step_ms))))
+    def movement_resolver(self, grid: LevelGrid, state: SimulationState) -> MovementResolver:
+        """Return a resolver for this grid and state, reusing the last one if both match.
+
+        The resolver's per-tick scratch is reset by spawn_from_emitters and
+        build_proposals, so only a new level or state needs a new one.
+        """
+        resolver = self._resolver
+        if resolver is None or resolver.grid is not grid or resolver.state is not state:
+            resolver = self._resolver = MovementResolver(grid, state)
+        return resolver
 
     def tick(
         self,
@@ -24,30 +47,39 @@ class SimulationEngine:
         emitters,
         sinks: Set,
         state: SimulationState,
+        grid: Optional[LevelGrid] = None,
     ) -> Set[int]:
-        """Run one simulation step. Returns the set of emitter IDs that spawned this tick."""
+        """Run one simulation step. Returns the set of emitter IDs that spawned this tick.
+
+        Callers that already track edits can pass the level's ``grid`` and skip
+        the per-tick check that the cached grid still matches the level.
+        """
         if not state.water:
             state.clear_sink_claims()
 
-        occupied = set(state.water.keys())
-        resolver = MovementResolver(w, h, walls, emitters, sinks, state)
-        resolver.spawn_from_emitters(occupied)
+        if grid is None:
+            grid = self.level_grid(w, h, walls, emitters, sinks)
+        if not state.water and not grid.emitter_spawns:
+            # Dry level whose emitters are all blocked: nothing can change.
+            return set()
+        resolver = self.movement_resolver(grid, state)
+        resolver.spawn_from_emitters()
 
-        spawned_emitter_ids: Set[int] = set()
-        for emitter in emitters:
-            tx, ty = emitter.x + emitter.dx, emitter.y + emitter.dy
-            if (tx, ty) in resolver.spawned_positions:
-                spawned_emitter_ids.add(emitter.id)
+        spawned_positions = resolver.spawned_positions
+        spawned_emitter_ids: Set[int] = {
+            eid for target, _, _, eid in grid.emitter_spawns if target in spawned_positions
+        }
 
         proposals = resolver.build_proposals()
-        targets = resolver.group_targets(proposals)
-        inflow_targets = resolver.build_inflow_targets(targets)
-        edges = resolver._select_edges(targets)
+        first_mover, contested = resolver.group_targets(proposals)
+        inflow_targets = resolver.build_inflow_targets(proposals)
+        edges = resolver._select_edges(first_mover, contested, proposals)
 
         next_water = resolver.advance_water(edges, inflow_targets, self.decay_steps)
-        filtered = WaterPruner.prune(next_water, emitters)
+        filtered = WaterPruner.prune(next_water, grid)
 
-        state.clear_water()
-        state.water.update(filtered)
+        # Adopt the freshly built mapping instead of copying it into the old
+        # dict; holders of SimulationState must read .water after each tick.
+        state.water = filtered
 
         return spawned_emitter_ids
@@ -4,7 +4,7 @@ from typing import Dict
 from typedefs import Coord
 
 
-@dataclass
+@dataclass(slots=True)
 class WaterCell:
     dx: int
     dy: int
@@ -12,6 +12,11 @@ class WaterCell:
     emitter_id: int
     prefer_left: bool
     pressured: bool = False
+    # Direction as an index into 3x3 per-direction tables: (dx + 1) * 3 + dy + 1.
+    dir_idx: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.dir_idx = (self.dx + 1) * 3 + self.dy + 1
 
 
 @dataclass
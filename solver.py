@@ -28,7 +28,9 @@ def _get_water_cells(engine, w, h, all_walls, emitters, sinks, steps=50):
     state = SimulationState()
     for _ in range(steps):
         engine.tick(w, h, all_walls, emitters, sinks, state)
-    return set(state.water.keys())
+    # The state is private to this call, so its key view serves as the
+    # occupancy set without a copy.
+    return state.water.keys()
 
 
 def _candidate_walls(water_cells, all_walls, emitter_positions, sinks, w, h):
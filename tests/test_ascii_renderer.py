@@ -0,0 +1,77 @@
+import unittest
+
+from ascii_renderer import AsciiRenderer
+from levels import DIR_TO_CHAR, SINK, Emitter
+from simulation_constants import WATER_DIR_CHAR
+from simulation_state import WaterCell
+
+W, H = 13, 12
+WALLS = {(x, 0) for x in range(W)} | {(0, y) for y in range(H)} | {(6, 5), (7, 5)}
+SINKS = {(11, 10), (1, 10)}
+EMITTERS = [
+    Emitter(0, 1, 1, 1, 0),
+    Emitter(1, 11, 1, 0, 1),
+    Emitter(2, 11, 9, -1, 0),
+    Emitter(3, 2, 10, 0, -1),
+]
+DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+def reference_render(w, h, walls, emitters, sinks, water, show_coords=False):
+    """The original list-of-rows renderer."""
+    grid = [["." for _ in range(w)] for _ in range(h)]
+    for (x, y) in walls:
+        grid[y][x] = "#"
+    for (x, y) in sinks:
+        grid[y][x] = SINK
+    for e in emitters:
+        grid[e.y][e.x] = DIR_TO_CHAR.get((e.dx, e.dy), "E")
+    for (x, y), cell in water.items():
+        if grid[y][x] in f"#{SINK}":
+            continue
+        grid[y][x] = WATER_DIR_CHAR.get((cell.dx, cell.dy), "~")
+    if not show_coords:
+        return "\n".join("".join(row) for row in grid)
+    label_w = max(2, len(str(h - 1)))
+    lines = [" " * (label_w + 1) + "".join(str(x % 10) for x in range(w))]
+    for y, row in enumerate(grid):
+        lines.append(f"{y:>{label_w}} " + "".join(row))
+    return "\n".join(lines)
+
+
+def make_water():
+    # Every direction (including the still and diagonal ones drawn as '~'),
+    # plus water under a wall, a sink and an emitter.
+    water = {(2 + i, 3): WaterCell(dx, dy, 0, 0, False) for i, (dx, dy) in enumerate(DIRECTIONS)}
+    water[(6, 5)] = WaterCell(1, 0, 0, 0, False)
+    water[(11, 10)] = WaterCell(0, 1, 0, 1, False)
+    water[(11, 1)] = WaterCell(-1, 0, 0, 1, False)
+    water[(12, 11)] = WaterCell(0, -1, 0, 2, False)
+    return water
+
+
+class RenderFromTemplateTest(unittest.TestCase):
+    def test_matches_reference_and_render(self):
+        water = make_water()
+        template = AsciiRenderer.render_static(W, H, WALLS, EMITTERS, SINKS)
+        for show_coords in (False, True):
+            with self.subTest(show_coords=show_coords):
+                expected = reference_render(W, H, WALLS, EMITTERS, SINKS, water, show_coords)
+                self.assertEqual(
+                    AsciiRenderer.render_from_template(template, W, H, water, show_coords), expected
+                )
+                self.assertEqual(AsciiRenderer.render(W, H, WALLS, EMITTERS, SINKS, water, show_coords), expected)
+
+    def test_template_is_reusable(self):
+        template = AsciiRenderer.render_static(W, H, WALLS, EMITTERS, SINKS)
+        pristine = bytes(template)
+        AsciiRenderer.render_from_template(template, W, H, make_water(), show_coords=True)
+        self.assertEqual(bytes(template), pristine)
+        self.assertEqual(
+            AsciiRenderer.render_from_template(template, W, H, {}),
+            reference_render(W, H, WALLS, EMITTERS, SINKS, {}),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
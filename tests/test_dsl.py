@@ -0,0 +1,99 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from ascii_renderer import AsciiRenderer
+from dsl import run_script
+from levels import get_level, parse_level
+from simulation_engine import SimulationEngine, steps_for_ms
+from simulation_state import SimulationState
+
+MULTI_LEVEL_SCRIPT = """
+# two levels, edits in each, and a revisit that must start from the original walls
+level split_switch
+wait_ms 3000
+remove 8,7; wait 40
+level turn
+add 10,3
+wait 25
+add 5,5; rm 10,3
+sleep 2000
+level split_switch
+wall+ 9,4
+tick 60
+"""
+
+
+def interpret_line_by_line(script_text, default_level_name="turn"):
+    """Reference interpreter: parse and execute each command as it is read."""
+    state = SimulationState()
+    w, h, walls, emitters, sinks = parse_level(get_level(default_level_name))
+    engine = SimulationEngine()
+
+    def advance(steps):
+        for _ in range(steps):
+            engine.tick(w, h, walls, emitters, sinks, state)
+
+    for raw in script_text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        for cmd in (c.strip() for c in line.split(";") if c.strip()):
+            name, *args = cmd.split()
+            name = name.lower()
+            if name == "level":
+                w, h, walls, emitters, sinks = parse_level(get_level(args[0]))
+                state.clear_water()
+            elif name in ("wait", "step", "steps", "tick"):
+                advance(int(args[0]) if args else 1)
+            elif name in ("wait_ms", "sleep"):
+                advance(steps_for_ms(int(args[0])))
+            else:
+                x, y = (int(v) for v in args[0].split(","))
+                if name in ("add", "wall+", "wall"):
+                    if (x, y) not in {(e.x, e.y) for e in emitters} and (x, y) not in sinks:
+                        walls.add((x, y))
+                else:
+                    walls.discard((x, y))
+                state.water.pop((x, y), None)
+    return AsciiRenderer.render(w, h, walls, emitters, sinks, state.water, show_coords=True)
+
+
+def run(script_text):
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        run_script(script_text, default_level_name="turn")
+    return buf.getvalue()
+
+
+class ScriptValidationTest(unittest.TestCase):
+    def assert_rejected_before_any_tick(self, script_text):
+        with mock.patch.object(SimulationEngine, "tick") as tick:
+            with self.assertRaises(ValueError):
+                run(script_text)
+        tick.assert_not_called()
+
+    def test_unknown_command(self):
+        self.assert_rejected_before_any_tick("wait 5\nflood 3,3")
+
+    def test_malformed_coordinate(self):
+        self.assert_rejected_before_any_tick("wait 5; add 3;4")
+
+    def test_unknown_level(self):
+        self.assert_rejected_before_any_tick("level no_such_level\nwait 5")
+
+    def test_out_of_bounds_edits_are_no_ops(self):
+        script = "level intro_straight\nwait 5\nadd 99,99\nremove -1,0\nrm 10,1\nwait 5"
+        baseline = "level intro_straight\nwait 5\nwait 5"
+        self.assertEqual(run(script), run(baseline))
+
+
+class CompiledScriptTest(unittest.TestCase):
+    def test_multi_level_script_matches_line_by_line_interpreter(self):
+        output = run(MULTI_LEVEL_SCRIPT)
+        self.assertEqual(output, f"Script complete\n{interpret_line_by_line(MULTI_LEVEL_SCRIPT)}\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
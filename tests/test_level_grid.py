@@ -0,0 +1,107 @@
+import unittest
+
+from level_grid import LevelGrid
+from levels import Emitter, parse_level
+
+ROOM = [
+    "#######",
+    "#.....#",
+    "#.....#",
+    "#.....#",
+    "#.....#",
+    "#.....#",
+    "#######",
+]
+DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+
+def baseline_tries(x, y, dx, dy, prefer_left):
+    """The original rule: forward, then the preferred side, then the other (a turn flips the preference)."""
+    left, right = (dy, -dx), (-dy, dx)
+    turns = (left, right) if prefer_left else (right, left)
+    tries = [(x + dx, y + dy, dx, dy, prefer_left)]
+    tries.extend((x + tdx, y + tdy, tdx, tdy, not prefer_left) for tdx, tdy in turns)
+    return tries
+
+
+class StepOptionsTest(unittest.TestCase):
+    def setUp(self):
+        self.grid = LevelGrid(*parse_level(ROOM))
+
+    def options(self, x, y, dx, dy, prefer_left):
+        w = self.grid.w
+        return [
+            (tgt % w, tgt // w, ndx, ndy, npref)
+            for tgt, ndx, ndy, npref, _sink in self.grid.step_options(x, y, dx, dy, prefer_left)
+        ]
+
+    def test_open_cell_matches_baseline_order_for_all_directions(self):
+        for dx, dy in DIRECTIONS:
+            for prefer_left in (False, True):
+                with self.subTest(direction=(dx, dy), prefer_left=prefer_left):
+                    self.assertEqual(
+                        self.options(3, 3, dx, dy, prefer_left),
+                        baseline_tries(3, 3, dx, dy, prefer_left),
+                    )
+
+    def test_walled_targets_are_dropped_in_baseline_order(self):
+        # From a corner, keep exactly the baseline tries that land on open cells.
+        walls = self.grid.walls
+        for dx, dy in DIRECTIONS:
+            for prefer_left in (False, True):
+                with self.subTest(direction=(dx, dy), prefer_left=prefer_left):
+                    expected = [t for t in baseline_tries(1, 1, dx, dy, prefer_left) if (t[0], t[1]) not in walls]
+                    self.assertEqual(self.options(1, 1, dx, dy, prefer_left), expected)
+
+    def test_repeated_lookups_return_the_memoised_options(self):
+        first = self.grid.step_options(2, 2, 1, 0, True)
+        self.assertIs(self.grid.step_options(2, 2, 1, 0, True), first)
+
+    def test_sink_targets_are_kept_and_marked(self):
+        grid = LevelGrid(*parse_level(["#####", "#.S.#", "#####"]))
+        (tgt, _dx, _dy, _pref, sink), = grid.step_options(1, 1, 1, 0, False)
+        self.assertEqual(tgt, grid.w + 2)
+        self.assertEqual(sink, (2, 1))
+
+
+class EmitterSpawnsTest(unittest.TestCase):
+    def test_blocked_and_out_of_bounds_targets_are_skipped(self):
+        walls = {(2, 0)}
+        sinks = {(4, 2)}
+        emitters = [
+            Emitter(0, 0, 1, -1, 0),  # faces off the left edge
+            Emitter(1, 2, 1, 0, -1),  # faces a wall
+            Emitter(2, 3, 2, 1, 0),  # faces a sink
+            Emitter(3, 1, 2, 1, 0),  # faces emitter 4
+            Emitter(4, 2, 2, 0, 1),  # faces an open cell
+        ]
+        grid = LevelGrid(5, 4, walls, emitters, sinks)
+        self.assertEqual(grid.emitter_spawns, (((2, 3), 0, 1, 4),))
+
+
+class MatchesTest(unittest.TestCase):
+    def setUp(self):
+        self.w, self.h, self.walls, self.emitters, self.sinks = parse_level(
+            ["#####", "#>..#", "#..S#", "#####"]
+        )
+        self.grid = LevelGrid(self.w, self.h, self.walls, self.emitters, self.sinks)
+
+    def test_unchanged_level_matches(self):
+        self.assertTrue(self.grid.matches(self.w, self.h, set(self.walls), list(self.emitters), set(self.sinks)))
+
+    def test_wall_change_does_not_match(self):
+        self.walls.add((2, 2))
+        self.assertFalse(self.grid.matches(self.w, self.h, self.walls, self.emitters, self.sinks))
+
+    def test_sink_change_does_not_match(self):
+        self.sinks.discard((3, 2))
+        self.sinks.add((2, 1))
+        self.assertFalse(self.grid.matches(self.w, self.h, self.walls, self.emitters, self.sinks))
+
+    def test_emitter_change_does_not_match(self):
+        self.emitters[0] = Emitter(0, 1, 1, 0, 1)
+        self.assertFalse(self.grid.matches(self.w, self.h, self.walls, self.emitters, self.sinks))
+
+
+if __name__ == "__main__":
+    unittest.main()
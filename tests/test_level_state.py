@@ -0,0 +1,34 @@
+import unittest
+
+from game import EMITTER, SINK, WALL, LevelState
+
+
+class LevelStateEditorTest(unittest.TestCase):
+    def test_removing_middle_emitter_keeps_order_of_the_rest(self):
+        state = LevelState("turn")
+        state.toggle(5, 3, EMITTER, (1, 0))
+        state.toggle(20, 2, EMITTER, (0, 1))
+        before = [e.id for e in state.emitters]
+        self.assertEqual(before, [0, 1, 2, 3])
+
+        action, removed = state.toggle(10, 6, EMITTER)
+
+        self.assertEqual(action, "removed")
+        self.assertEqual(removed.id, 1)
+        self.assertEqual([e.id for e in state.emitters], [0, 2, 3])
+        self.assertNotIn((10, 6), state.emitter_positions)
+        self.assertEqual(state.level_grid().emitters, tuple(state.emitters))
+
+    def test_edits_are_seen_by_the_next_occupancy_check(self):
+        state = LevelState("turn")
+        self.assertEqual(state.toggle(5, 3, WALL), ("added", None))
+        # The cell now holds a wall, so a sink can be neither toggled nor placed there.
+        self.assertEqual(state.toggle(5, 3, SINK), (None, None))
+        self.assertEqual(state.place(5, 3, SINK), (None, None))
+        self.assertEqual(state.toggle(5, 3, WALL), ("removed", None))
+        self.assertEqual(state.place(5, 3, SINK), ("added", None))
+        self.assertIn((5, 3), state.level_grid().sinks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from levels import Emitter, parse_level
+
+LINES = [
+    "#####",
+    "#>..#",
+    "#..S#",
+    "#####",
+]
+
+
+class ParseLevelTest(unittest.TestCase):
+    def test_edits_to_one_result_do_not_leak_into_the_next(self):
+        w, h, walls, emitters, sinks = parse_level(LINES)
+        expected = (set(walls), list(emitters), set(sinks))
+
+        walls.add((2, 2))
+        walls.discard((0, 0))
+        sinks.add((1, 2))
+        emitters.append(Emitter(1, 2, 1, 0, 1))
+        emitters.pop(0)
+
+        _, _, walls2, emitters2, sinks2 = parse_level(list(LINES))
+        self.assertEqual((walls2, emitters2, sinks2), expected)
+        self.assertIsNot(walls2, walls)
+        self.assertIsNot(sinks2, sinks)
+        self.assertIsNot(emitters2, emitters)
+
+    def test_returns_mutable_containers(self):
+        _, _, walls, emitters, sinks = parse_level(LINES)
+        self.assertIsInstance(walls, set)
+        self.assertIsInstance(sinks, set)
+        self.assertIsInstance(emitters, list)
+
+
+if __name__ == "__main__":
+    unittest.main()
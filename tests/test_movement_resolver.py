@@ -0,0 +1,229 @@
+import sys
+import unittest
+
+from level_grid import LevelGrid
+from levels import get_level, parse_level
+from movement_resolver import MovementResolver
+from simulation_engine import SimulationEngine
+from simulation_state import SimulationState, WaterCell
+
+ROOM = [
+    "#######",
+    "#.....#",
+    "#.....#",
+    "#.....#",
+    "#.....#",
+    "#.....#",
+    "#######",
+]
+CORRIDOR = [
+    "#######",
+    "#.....#",
+    "#######",
+]
+SINK_ROOM = [
+    "#####",
+    "#...#",
+    "#.S.#",
+    "#...#",
+    "#####",
+]
+
+RIGHT, LEFT, DOWN, UP = (1, 0), (-1, 0), (0, 1), (0, -1)
+
+
+def cell(direction, eid=0, prefer_left=False):
+    dx, dy = direction
+    return WaterCell(dx, dy, 0, eid, prefer_left)
+
+
+def resolve(lines, water, sink_claims=None):
+    """Run one tick's resolver stages; returns (edges, succeeds) keyed by (x, y)."""
+    grid = LevelGrid(*parse_level(lines))
+    state = SimulationState(water=dict(water), sink_claims=dict(sink_claims or {}))
+    resolver = MovementResolver(grid, state)
+    resolver.spawn_from_emitters()
+    proposals = resolver.build_proposals()
+    first_mover, contested = resolver.group_targets(proposals)
+    edges = resolver._select_edges(first_mover, contested, proposals)
+    succeeds = resolver._resolve_moves(edges, resolver.cells.keys())
+    coords = grid.coords
+    return (
+        {coords[src]: coords[edge[0]] for src, edge in edges.items()},
+        {coords[src]: ok for src, ok in succeeds.items()},
+    )
+
+
+def advance(lines, water, sink_claims=None):
+    """Water after one resolver pass (no pruning), keyed by (x, y)."""
+    grid = LevelGrid(*parse_level(lines))
+    state = SimulationState(water=dict(water), sink_claims=dict(sink_claims or {}))
+    resolver = MovementResolver(grid, state)
+    resolver.spawn_from_emitters()
+    proposals = resolver.build_proposals()
+    first_mover, contested = resolver.group_targets(proposals)
+    inflow = resolver.build_inflow_targets(proposals)
+    edges = resolver._select_edges(first_mover, contested, proposals)
+    next_water = resolver.advance_water(edges, inflow, decay_steps=100)
+    return {grid.coords[idx]: c for idx, c in next_water.items()}, state
+
+
+class ContestedTargetTest(unittest.TestCase):
+    def test_lowest_row_major_source_wins_an_empty_target(self):
+        water = {(1, 2): cell(RIGHT), (3, 2): cell(LEFT), (2, 1): cell(DOWN)}
+        edges, _ = resolve(ROOM, water)
+        self.assertEqual(edges, {(2, 1): (2, 2)})
+
+    def test_straight_mover_beats_a_turning_one(self):
+        # (1, 1) heading up is walled and turns right into (2, 1); (3, 1)
+        # arrives there heading straight on and wins despite its higher index.
+        water = {(1, 1): cell(UP), (3, 1): cell(LEFT)}
+        edges, _ = resolve(ROOM, water)
+        self.assertEqual(edges[(3, 1)], (2, 1))
+        self.assertNotIn((1, 1), edges)
+
+    def test_stuck_occupant_yields_to_incoming_same_emitter_water(self):
+        # (1, 1) is walled on every side it may try, so it proposes to stay;
+        # the stay penalty lets the queued cell behind it win its own cell.
+        water = {(1, 1): cell(LEFT), (2, 1): cell(LEFT)}
+        edges, succeeds = resolve(CORRIDOR, water)
+        self.assertEqual(edges, {(2, 1): (1, 1)})
+        self.assertFalse(succeeds[(2, 1)])
+
+    def test_stuck_occupant_keeps_its_cell_against_another_emitter(self):
+        water = {(1, 1): cell(LEFT, eid=0), (2, 1): cell(LEFT, eid=1)}
+        edges, _ = resolve(CORRIDOR, water)
+        self.assertEqual(edges, {(1, 1): (1, 1)})
+
+    def test_occupants_emitter_wins_over_lower_source(self):
+        # (2, 2) belongs to emitter 0 and is moving out; emitter 1's mover has
+        # the lower index but emitter 0's mover takes the cell.
+        water = {
+            (2, 1): cell(DOWN, eid=1),
+            (2, 2): cell(DOWN, eid=0),
+            (3, 2): cell(LEFT, eid=0),
+        }
+        edges, succeeds = resolve(ROOM, water)
+        self.assertEqual(edges[(3, 2)], (2, 2))
+        self.assertNotIn((2, 1), edges)
+        self.assertTrue(succeeds[(3, 2)])
+
+    def test_uncontested_targets_keep_their_only_proposal(self):
+        # Mid-run on a busy level, the first_mover/contested split must agree
+        # with a full grouping of proposals by target, and every uncontested
+        # target must be won by its only mover.
+        w, h, walls, emitters, sinks = parse_level(get_level("split_maze"))
+        engine = SimulationEngine()
+        state = SimulationState()
+        grid = engine.level_grid(w, h, walls, emitters, sinks)
+        for _ in range(300):
+            engine.tick(w, h, walls, emitters, sinks, state, grid)
+            snapshot = SimulationState(water=dict(state.water), sink_claims=dict(state.sink_claims))
+            resolver = MovementResolver(grid, snapshot)
+            resolver.spawn_from_emitters()
+            proposals = resolver.build_proposals()
+            first_mover, contested = resolver.group_targets(proposals)
+            if contested:
+                break
+
+        groups = {}
+        for src, proposal in proposals.items():
+            groups.setdefault(proposal[0], []).append(src)
+        self.assertEqual(first_mover, {tgt: srcs[0] for tgt, srcs in groups.items()})
+        self.assertEqual(contested, {tgt: srcs for tgt, srcs in groups.items() if len(srcs) > 1})
+        self.assertTrue(contested)
+
+        edges = resolver._select_edges(first_mover, contested, proposals)
+        for tgt, srcs in groups.items():
+            if len(srcs) == 1:
+                self.assertEqual(edges[srcs[0]], proposals[srcs[0]])
+        self.assertEqual(len(edges), len(groups))
+
+
+class SinkContestTest(unittest.TestCase):
+    def test_unclaimed_sink_goes_to_lowest_source_and_is_claimed(self):
+        water = {(2, 1): cell(DOWN, eid=0), (1, 2): cell(RIGHT, eid=1)}
+        next_water, state = advance(SINK_ROOM, water)
+        self.assertEqual(state.sink_claims, {(2, 2): 0})
+        # The winner drains into the sink; the loser waits where it was.
+        self.assertEqual(set(next_water), {(1, 2)})
+
+    def test_claimed_sink_is_closed_to_other_emitters(self):
+        water = {(2, 1): cell(DOWN, eid=0), (1, 2): cell(RIGHT, eid=1)}
+        edges, _ = resolve(SINK_ROOM, water, sink_claims={(2, 2): 1})
+        self.assertEqual(edges[(1, 2)], (2, 2))
+        self.assertNotEqual(edges[(2, 1)], (2, 2))
+
+
+class MoveChainTest(unittest.TestCase):
+    def test_rotation_cycle_moves_every_cell(self):
+        water = {(1, 1): cell(RIGHT), (2, 1): cell(DOWN), (2, 2): cell(LEFT), (1, 2): cell(UP)}
+        next_water, _ = advance(ROOM, water)
+        self.assertEqual(
+            {pos: (c.dx, c.dy) for pos, c in next_water.items()},
+            {(2, 1): RIGHT, (2, 2): DOWN, (1, 2): LEFT, (1, 1): UP},
+        )
+
+    def test_mover_blocked_by_a_cell_staying_put(self):
+        # (1, 1) is stuck; (2, 1) and (3, 1) queue behind it and all stay.
+        water = {(1, 1): cell(LEFT), (2, 1): cell(LEFT), (3, 1): cell(LEFT)}
+        edges, succeeds = resolve(CORRIDOR, water)
+        self.assertEqual(edges, {(2, 1): (1, 1), (3, 1): (2, 1)})
+        self.assertEqual({src: succeeds[src] for src in edges}, {(2, 1): False, (3, 1): False})
+        next_water, _ = advance(CORRIDOR, water)
+        self.assertEqual(set(next_water), set(water))
+
+    def test_large_emitter_ids_do_not_alias_inflow(self):
+        # Emitter IDs grow without bound in the editor. Water of emitter 2**16
+        # moving into (4, 1) must not count as inflow for emitter 0's stuck
+        # cell next door, which should keep ageing.
+        lines = ["########", "#.....##", "########"]
+        stuck = WaterCell(1, 0, 5, 0, False)
+        water = {(3, 1): cell(RIGHT, eid=1 << 16), (5, 1): stuck}
+        next_water, _ = advance(lines, water)
+        self.assertEqual(next_water[(5, 1)].age, 6)
+        self.assertEqual(next_water[(4, 1)].emitter_id, 1 << 16)
+
+
+class ResolveMovesTest(unittest.TestCase):
+    """_resolve_moves on hand-built edges over an open single-row grid."""
+
+    def setUp(self):
+        self.length = sys.getrecursionlimit() + 100
+        grid = LevelGrid(*parse_level(["." * (self.length + 2)]))
+        self.resolver = MovementResolver(grid, SimulationState())
+
+    @staticmethod
+    def edge(tgt):
+        return (tgt, 1, 0, 0, False)
+
+    def test_chain_longer_than_recursion_limit_into_empty_cell(self):
+        n = self.length
+        edges = {i: self.edge(i + 1) for i in range(n)}
+        succeeds = self.resolver._resolve_moves(edges, set(range(n)))
+        self.assertEqual(succeeds, {i: True for i in range(n)})
+
+    def test_chain_longer_than_recursion_limit_into_stuck_cell(self):
+        n = self.length
+        edges = {i: self.edge(i + 1) for i in range(n)}
+        succeeds = self.resolver._resolve_moves(edges, set(range(n + 1)))
+        self.assertEqual(succeeds, {i: False for i in range(n)} | {n: False})
+
+    def test_cycle_longer_than_two(self):
+        edges = {0: self.edge(1), 1: self.edge(2), 2: self.edge(3), 3: self.edge(0)}
+        succeeds = self.resolver._resolve_moves(edges, {0, 1, 2, 3})
+        self.assertEqual(succeeds, {0: True, 1: True, 2: True, 3: True})
+
+    def test_chain_feeding_into_a_cycle(self):
+        # 5 -> 4 -> 1 -> 2 -> 3 -> 1; walked from the chain end and from the
+        # cycle first, every cell succeeds either way.
+        chain_first = {5: self.edge(4), 4: self.edge(1), 1: self.edge(2), 2: self.edge(3), 3: self.edge(1)}
+        cycle_first = {1: self.edge(2), 2: self.edge(3), 3: self.edge(1), 4: self.edge(1), 5: self.edge(4)}
+        occupied = {1, 2, 3, 4, 5}
+        for edges in (chain_first, cycle_first):
+            succeeds = self.resolver._resolve_moves(edges, occupied)
+            self.assertEqual({src: succeeds[src] for src in edges}, {src: True for src in edges})
+
+
+if __name__ == "__main__":
+    unittest.main()
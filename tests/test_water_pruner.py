@@ -0,0 +1,70 @@
+import unittest
+
+from level_grid import LevelGrid
+from levels import parse_level
+from simulation_state import WaterCell
+from water_pruner import WaterPruner
+
+
+def prune(lines, owners):
+    """Prune water given as {(x, y): emitter_id}; returns the surviving positions."""
+    grid = LevelGrid(*parse_level(lines))
+    next_water = {y * grid.w + x: WaterCell(0, 1, 0, eid, False) for (x, y), eid in owners.items()}
+    return set(WaterPruner.prune(next_water, grid))
+
+
+class RowBoundaryTest(unittest.TestCase):
+    def test_last_column_is_not_adjacent_to_next_rows_first(self):
+        lines = ["..v..", ".....", ".....", "....."]
+        stream = {(2, 1): 0, (3, 1): 0, (4, 1): 0}
+        # (0, 2) directly follows (4, 1) in row-major order.
+        self.assertEqual(prune(lines, {**stream, (0, 2): 0}), set(stream))
+
+    def test_first_column_is_not_adjacent_to_previous_rows_last(self):
+        lines = [".....", ".....", ".....", "..^.."]
+        stream = {(2, 2): 0, (1, 2): 0, (0, 2): 0}
+        # (4, 1) directly precedes (0, 2) in row-major order.
+        self.assertEqual(prune(lines, {**stream, (4, 1): 0}), set(stream))
+
+
+class DisconnectedWaterTest(unittest.TestCase):
+    def test_water_of_a_removed_emitter_is_pruned(self):
+        lines = ["..v..", ".....", "....."]
+        stream = {(2, 1): 0, (2, 2): 0}
+        self.assertEqual(prune(lines, {**stream, (0, 1): 7, (0, 2): 7}), set(stream))
+
+    def test_all_water_is_pruned_without_emitters(self):
+        self.assertEqual(prune(["....", "...."], {(1, 0): 0, (1, 1): 0}), set())
+
+    def test_stray_component_of_a_live_emitter_is_pruned(self):
+        lines = ["..v..", ".....", "....."]
+        stream = {(2, 1): 0, (2, 2): 0}
+        self.assertEqual(prune(lines, {**stream, (4, 2): 0}), set(stream))
+
+    def test_nothing_pruned_returns_every_cell(self):
+        lines = ["..v..", ".....", "....."]
+        stream = {(2, 1): 0, (2, 2): 0, (3, 2): 0}
+        self.assertEqual(prune(lines, stream), set(stream))
+
+
+class SeedSelectionTest(unittest.TestCase):
+    def test_dry_spawn_cell_seeds_from_nearest_water(self):
+        lines = ["..v..", ".....", ".....", "....."]
+        near = {(3, 1): 0, (3, 2): 0}
+        self.assertEqual(prune(lines, {**near, (0, 3): 0}), set(near))
+
+    def test_every_cell_at_the_minimum_distance_seeds(self):
+        lines = ["..v..", ".....", "....."]
+        tied = {(1, 1): 0, (3, 1): 0, (3, 2): 0}
+        # (1, 1) and (3, 1) are both two steps from the emitter and unconnected.
+        self.assertEqual(prune(lines, {**tied, (0, 2): 0}), set(tied))
+
+    def test_touching_streams_flood_only_their_own_water(self):
+        # Emitter 1's stray cell touches emitter 0's stream but not its own.
+        lines = [".....", ">...<", "....."]
+        kept = {(1, 1): 0, (2, 1): 0, (3, 1): 1}
+        self.assertEqual(prune(lines, {**kept, (1, 2): 1}), set(kept))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 from typing import Tuple
 
 Coord = Tuple[int, int]
+CellIndex = int  # flat row-major cell index, y * w + x
 Direction = Tuple[int, int]
 EmitterId = int
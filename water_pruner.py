@@ -1,42 +1,63 @@
-from typing import Dict, Iterable, Mapping, Set
+from typing import Dict, List, Mapping, Set
 
+from level_grid import LevelGrid
 from simulation_state import WaterCell
-from typedefs import Coord
+from typedefs import CellIndex, Coord
 
 
 class WaterPruner:
     @staticmethod
-    def prune(next_water: Mapping[Coord, WaterCell], emitters: Iterable) -> Dict[Coord, WaterCell]:
-        positions_by_eid: Dict[int, Set[Coord]] = {}
-        for position, cell in next_water.items():
-            positions_by_eid.setdefault(cell.emitter_id, set()).add(position)
+    def prune(next_water: Mapping[CellIndex, WaterCell], grid: LevelGrid) -> Dict[Coord, WaterCell]:
+        """Drop water not connected to the part of its stream nearest its emitter.
 
-        reachable: Dict[int, Set[Coord]] = {}
-        for emitter in emitters:
-            positions = positions_by_eid.get(emitter.id, set())
+        Takes the resolver's next-tick water keyed by flat cell index and
+        returns the survivors keyed by the grid's (x, y) tuples.
+        """
+        w, coords = grid.w, grid.coords
+        positions_by_eid: Dict[int, Set[CellIndex]] = {}
+        for idx, cell in next_water.items():
+            group = positions_by_eid.get(cell.emitter_id)
+            if group is None:
+                positions_by_eid[cell.emitter_id] = {idx}
+            else:
+                group.add(idx)
+
+        kept: Set[CellIndex] = set()
+        last_x = w - 1
+        for emitter in grid.emitters:
+            positions = positions_by_eid.get(emitter.id)
             if not positions:
                 continue
 
             # Keep the connected component that is closest to the emitter. Use the
             # minimum Manhattan-distance tiles as attachment points, then flood
-            # through same-emitter water (4-neighbor).
-            min_dist = min(abs(nx - emitter.x) + abs(ny - emitter.y) for (nx, ny) in positions)
-            seeds = [(nx, ny) for (nx, ny) in positions if abs(nx - emitter.x) + abs(ny - emitter.y) == min_dist]
-            stack = list(seeds)
-            seen = reachable.setdefault(emitter.id, set())
-
+            # through same-emitter water (4-neighbor). Emitter IDs are unique, so
+            # the group doubles as the unvisited set: a cell is taken out of it
+            # when first reached and never pushed twice.
+            # The seeds are found in one pass that tracks the running minimum.
+            ex, ey = emitter.x, emitter.y
+            min_dist = w + grid.h
+            stack: List[CellIndex] = []
+            for idx in positions:
+                x, y = coords[idx]
+                dist = abs(x - ex) + abs(y - ey)
+                if dist < min_dist:
+                    min_dist = dist
+                    stack = [idx]
+                elif dist == min_dist:
+                    stack.append(idx)
+            positions.difference_update(stack)
             while stack:
-                pos = stack.pop()
-                if pos in seen:
-                    continue
-                seen.add(pos)
-                x, y = pos
-                for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
-                    if (nx, ny) in positions:
-                        stack.append((nx, ny))
+                idx = stack.pop()
+                kept.add(idx)
+                # Flat neighbours; -1 (never a cell) stands in for a side
+                # neighbour that would wrap onto the next or previous row.
+                x = coords[idx][0]
+                for neighbor in (idx + 1 if x != last_x else -1, idx - 1 if x else -1, idx + w, idx - w):
+                    if neighbor in positions:
+                        positions.remove(neighbor)
+                        stack.append(neighbor)
 
-        filtered: Dict[Coord, WaterCell] = {}
-        for position, cell in next_water.items():
-            if position in reachable.get(cell.emitter_id, set()):
-                filtered[position] = cell
-        return filtered
+        if len(kept) == len(next_water):
+            return {coords[idx]: cell for idx, cell in next_water.items()}
+        return {coords[idx]: cell for idx, cell in next_water.items() if idx in kept}